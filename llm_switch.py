@@ -1,22 +1,56 @@
+import asyncio
+import logging
 import os
-from openai import OpenAI
-import google.generativeai as genai
-from typing import Literal, Union
-from dotenv import load_dotenv
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Deque, Dict, List, Literal, Optional, Sequence, Union
+
+from python_agents.src.agents.hedging import Hedger, LatencyTracker, hedge_policy
+
+if TYPE_CHECKING:
+    # The provider SDKs are slow to import; they are loaded on first use
+    from openai import AsyncOpenAI
+    import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+ModelName = Literal["gpt-4", "gpt-3.5-turbo", "gemini-pro"]
+
+
+class LLMError(Exception):
+    """Raised when a provider call fails."""
+    pass
+
+
+@dataclass
+class GenerationResult:
+    """Outcome of one prompt in a batch: either text or an error."""
+    prompt: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
-# Load environment variables
-load_dotenv()
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, latency_window: int = 1000,
+                 role: str = "LLM Client"):
+        from dotenv import load_dotenv
+
         # Load API keys from environment variables
+        load_dotenv()
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        
-        # Initialize clients
-        self.openai_client = OpenAI(api_key=self.openai_api_key)
-        genai.configure(api_key=self.gemini_api_key)
-        
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+        self.max_concurrency = max(1, max_concurrency)
+
         # Available models
         self.models = {
             "gpt-4": {"provider": "openai", "name": "gpt-4"},
@@ -24,34 +58,112 @@ class LLMClient:
             "gemini-pro": {"provider": "gemini", "name": "gemini-pro"},
         }
 
-    def generate_response(
+        # Clients are reused across calls; the OpenAI client keeps an HTTP
+        # connection pool, which is bound to the event loop that created it
+        self._openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = \
+            weakref.WeakKeyDictionary()
+        self._genai = None
+        self._gemini_models: Dict[str, "genai.GenerativeModel"] = {}
+        self._clients_lock = threading.Lock()
+
+        # Background loop backing the synchronous API, so its connections persist between calls
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._latency_window = latency_window
+        self._stats_lock = threading.Lock()
+
+        # Hedging and failover share the agents' helper; the role selects the
+        # policy (LLM_HEDGE_PERCENTILE, LLM_HEDGE_POLICIES) and labels its metrics
+        self.role = role
+        self.hedge_policy = hedge_policy(role)
+        self.hedger = Hedger(LatencyTracker(window=latency_window))
+
+    def _openai_client(self) -> "AsyncOpenAI":
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._openai_clients.get(loop)
+            if client is None:
+                client = self._openai_clients[loop] = AsyncOpenAI(api_key=self.openai_api_key)
+            return client
+
+    def _gemini_model(self, name: str) -> "genai.GenerativeModel":
+        with self._clients_lock:
+            if self._genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.gemini_api_key)
+                self._genai = genai
+            model_instance = self._gemini_models.get(name)
+            if model_instance is None:
+                model_instance = self._gemini_models[name] = self._genai.GenerativeModel(name)
+            return model_instance
+
+    def _record(self, provider: str, elapsed: float, failed: bool) -> None:
+        with self._stats_lock:
+            samples = self._latencies.get(provider)
+            if samples is None:
+                samples = self._latencies[provider] = deque(maxlen=self._latency_window)
+            samples.append(elapsed)
+            self._calls[provider] = self._calls.get(provider, 0) + 1
+            if failed:
+                self._errors[provider] = self._errors.get(provider, 0) + 1
+
+    async def agenerate(
         self,
         prompt: str,
-        model: Literal["gpt-4", "gpt-3.5-turbo", "gemini-pro"] = "gpt-3.5-turbo",
+        model: ModelName = "gpt-3.5-turbo",
         temperature: float = 0.7,
-        max_tokens: int = 1000
-    ) -> Union[str, None]:
+        max_tokens: int = 1000,
+        fallback: Optional[ModelName] = None
+    ) -> str:
         """
-        Generate a response using the specified LLM model.
-        
+        Generate a response asynchronously using the specified LLM model.
+
         Args:
             prompt (str): The input prompt for the model
             model (str): The model to use (gpt-4, gpt-3.5-turbo, or gemini-pro)
             temperature (float): Controls randomness in the output (0.0 to 1.0)
             max_tokens (int): Maximum number of tokens in the response
-            
+            fallback (str): Optional second model. It is raced against a slow
+                primary (see hedge_delay) and used at once if the primary fails,
+                as the role's hedge policy directs
+
         Returns:
             str: The generated response
+
+        Raises:
+            ValueError: If a model is not supported
+            LLMError: If the provider call fails
         """
-        try:
-            if model not in self.models:
-                raise ValueError(f"Model {model} not supported. Available models: {list(self.models.keys())}")
+        self._check_models(model, fallback)
+        policy = replace(self.hedge_policy, model=model, secondary=fallback or "")
+        secondary = None
+        if fallback is not None:
+            secondary = lambda: self._call(prompt, fallback, temperature, max_tokens)
+        return await self.hedger.acall(self.role, policy, lambda: self._call(prompt, model, temperature, max_tokens),
+                                       secondary)
+
+    def _check_models(self, *names: Optional[str]) -> None:
+        for name in names:
+            if name is not None and name not in self.models:
+                raise ValueError(f"Model {name} not supported. Available models: {list(self.models.keys())}")
 
-            provider = self.models[model]["provider"]
-            
+    def hedge_delay(self, model: ModelName) -> float:
+        """Seconds to wait for a model before hedging: its recent latency percentile."""
+        return self.hedger.delay(replace(self.hedge_policy, model=model))
+
+    async def _call(self, prompt: str, model: ModelName, temperature: float, max_tokens: int) -> str:
+        provider = self.models[model]["provider"]
+        start = time.perf_counter()
+        try:
             if provider == "openai":
-                response = self.openai_client.chat.completions.create(
-                    model=model,
+                response = await self._openai_client().chat.completions.create(
+                    model=self.models[model]["name"],
                     messages=[
                         {"role": "system", "content": "You are a helpful assistant."},
                         {"role": "user", "content": prompt}
@@ -59,42 +171,155 @@ class LLMClient:
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
-                return response.choices[0].message.content
-                
-            elif provider == "gemini":
-                model_instance = genai.GenerativeModel(self.models[model]["name"])
-                response = model_instance.generate_content(prompt)
-                return response.text
-                
+                text = response.choices[0].message.content
+            else:
+                response = await self._gemini_model(self.models[model]["name"]).generate_content_async(
+                    prompt,
+                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens}
+                )
+                text = response.text
         except Exception as e:
-            print(f"Error generating response: {str(e)}")
+            self._record(provider, time.perf_counter() - start, failed=True)
+            raise LLMError(f"{model} request failed: {str(e)}") from e
+
+        self._record(provider, time.perf_counter() - start, failed=False)
+        return text
+
+    async def agenerate_many(
+        self,
+        prompts: Sequence[str],
+        model: ModelName = "gpt-3.5-turbo",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        max_concurrency: Optional[int] = None,
+        fallback: Optional[ModelName] = None
+    ) -> List[GenerationResult]:
+        """
+        Generate responses for many prompts with at most max_concurrency calls in flight.
+
+        Returns:
+            list: One GenerationResult per prompt, in input order; a failed
+                prompt carries its error instead of failing the batch
+
+        Raises:
+            ValueError: If model or fallback is not supported
+        """
+        # Checked once here; inside the fan-out a ValueError would escape gather
+        self._check_models(model, fallback)
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def one(prompt: str) -> GenerationResult:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    text = await self.agenerate(prompt, model=model, temperature=temperature,
+                                                max_tokens=max_tokens, fallback=fallback)
+                    result = GenerationResult(prompt, text=text)
+                except LLMError as e:
+                    result = GenerationResult(prompt, error=str(e))
+                result.latency_ms = 1000 * (time.perf_counter() - start)
+                return result
+
+        return list(await asyncio.gather(*(one(prompt) for prompt in prompts)))
+
+    def _run(self, coro):
+        """Run a coroutine on the client's background event loop and wait for it."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def generate_response(
+        self,
+        prompt: str,
+        model: ModelName = "gpt-3.5-turbo",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        fallback: Optional[ModelName] = None
+    ) -> Union[str, None]:
+        """
+        Generate a response using the specified LLM model.
+
+        Args:
+            prompt (str): The input prompt for the model
+            model (str): The model to use (gpt-4, gpt-3.5-turbo, or gemini-pro)
+            temperature (float): Controls randomness in the output (0.0 to 1.0)
+            max_tokens (int): Maximum number of tokens in the response
+            fallback (str): Optional second model for hedging and failover
+
+        Returns:
+            str: The generated response, or None if the call failed
+        """
+        try:
+            return self._run(self.agenerate(prompt, model=model, temperature=temperature, max_tokens=max_tokens,
+                                            fallback=fallback))
+        except (ValueError, LLMError) as e:
+            logger.error(f"Error generating response: {str(e)}")
             return None
 
+    def generate_many(
+        self,
+        prompts: Sequence[str],
+        model: ModelName = "gpt-3.5-turbo",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        max_concurrency: Optional[int] = None,
+        fallback: Optional[ModelName] = None
+    ) -> List[GenerationResult]:
+        """Synchronous form of agenerate_many, for scripts and bulk evaluation."""
+        return self._run(self.agenerate_many(prompts, model=model, temperature=temperature,
+                                             max_tokens=max_tokens, max_concurrency=max_concurrency,
+                                             fallback=fallback))
+
+    def get_hedge_stats(self) -> Dict:
+        """Hedge and failover counts and rates for this client's role."""
+        return self.hedger.get_stats().get(self.role, {})
+
+    def get_latency_stats(self) -> Dict[str, Dict]:
+        """Per-provider call counts, error counts and latency percentiles."""
+        with self._stats_lock:
+            stats = {}
+            for provider, samples in self._latencies.items():
+                ordered = sorted(samples)
+                calls = self._calls.get(provider, 0)
+                stats[provider] = {
+                    'calls': calls,
+                    'errors': self._errors.get(provider, 0),
+                    'avg_ms': 1000 * sum(ordered) / len(ordered),
+                    'p50_ms': 1000 * ordered[len(ordered) // 2],
+                    'p95_ms': 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max_ms': 1000 * ordered[-1]
+                }
+            return stats
+
 def main():
+    logging.basicConfig(level=logging.INFO)
+
     # Initialize the LLM client
     llm_client = LLMClient()
-    
+
     # Example prompts for testing
     test_prompts = [
         "What is artificial intelligence?",
         "Explain how neural networks work.",
         "What are the applications of machine learning?"
     ]
-    
+
     # Test with different models
     models = ["gpt-3.5-turbo", "gemini-pro", "gpt-4"]
-    
-    for prompt in test_prompts:
-        print(f"\nPrompt: {prompt}")
+
+    for model in models:
+        print(f"\nUsing {model}:")
         print("-" * 50)
-        
-        for model in models:
-            print(f"\nUsing {model}:")
-            response = llm_client.generate_response(prompt, model=model)
-            if response:
-                print(f"Response: {response}\n")
+        for result in llm_client.generate_many(test_prompts, model=model):
+            print(f"\nPrompt: {result.prompt} ({result.latency_ms:.0f}ms)")
+            if result.ok:
+                print(f"Response: {result.text}\n")
             else:
-                print(f"Failed to generate response with {model}")
+                print(f"Failed to generate response with {model}: {result.error}")
+
+    print(f"\nLatency by provider: {llm_client.get_latency_stats()}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for the CHART_DATA / TABLE_DATA parser on large analyst outputs.
+
+Run from the repository root:
+    python -m python_agents.benchmarks.parsing_benchmark --blocks 500
+"""
+import argparse
+import re
+import time
+
+from ..src.agents.parsing import parse_structured_output
+
+
+def build_output(blocks: int) -> str:
+    """Synthesize an analyst report with the given number of chart/table blocks."""
+    parts = []
+    for i in range(blocks):
+        parts.append(f"## Section {i}\n\n" + f"Qualitative analysis of segment {i}, its buyers and competitors. " * 20 + "\n")
+        parts.append(
+            f'[CHART_DATA type=line title="Growth {i}"]\nYears:\n'
+            + "".join(f"- {2000 + year}: ${year * 10 + i}M\n" for year in range(20))
+            + "[/CHART_DATA]\n"
+        )
+        parts.append(
+            f'[TABLE_DATA title="Competitors {i}"]\n| Competitor | Share | Score |\n|---|---|---|\n'
+            + "".join(f"| Company {row} | {row}% | {row / 10} |\n" for row in range(10))
+            + "[/TABLE_DATA]\n"
+        )
+    return "".join(parts)
+
+
+def legacy_parse(result: str):
+    """The per-analyst extraction this parser replaced, kept as a baseline."""
+    charts = []
+    tables = []
+    for match in re.finditer(r'\[CHART_DATA type=(\w+) title="([^"]+)"\](.*?)\[/CHART_DATA\]', result, re.DOTALL):
+        chart_type, title, data = match.groups()
+        labels = []
+        values = []
+        for line in data.split('\n'):
+            if ':' in line and '-' in line:
+                label, value = line.split(':')
+                labels.append(label.split('-')[1].strip())
+                values.append(float(value.replace('$', '').replace('M', '').strip()))
+        charts.append({'type': chart_type, 'title': title, 'data': {'labels': labels, 'datasets': [{'label': title, 'data': values}]}})
+    for match in re.finditer(r'\[TABLE_DATA title="([^"]+)"\](.*?)\[/TABLE_DATA\]', result, re.DOTALL):
+        title, data = match.groups()
+        lines = data.strip().split('\n')
+        headers = [h.strip() for h in lines[0].replace('|', '#').split('#') if h.strip()]
+        rows = []
+        for row in lines[2:]:
+            values = [v.strip() for v in row.replace('|', '#').split('#') if v.strip()]
+            if len(values) == len(headers):
+                rows.append(dict(zip(headers, values)))
+        tables.append({'title': title, 'headers': headers, 'rows': rows})
+    content = re.sub(r'\[CHART_DATA.*?\[/CHART_DATA\]', '', result, flags=re.DOTALL)
+    content = re.sub(r'\[TABLE_DATA.*?\[/TABLE_DATA\]', '', content, flags=re.DOTALL)
+    return content, charts, tables
+
+
+def bench(fn, text: str, repeat: int) -> float:
+    """Best-of-repeat wall time in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(blocks: int = 500, repeat: int = 5) -> dict:
+    text = build_output(blocks)
+    legacy = bench(legacy_parse, text, repeat)
+    shared = bench(parse_structured_output, text, repeat)
+    return {
+        'blocks': blocks,
+        'bytes': len(text),
+        'legacy_ms': legacy * 1000,
+        'shared_ms': shared * 1000,
+        'speedup': legacy / shared if shared else None,
+        'mb_per_s': len(text) / shared / 1e6 if shared else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for key, value in run(args.blocks, args.repeat).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
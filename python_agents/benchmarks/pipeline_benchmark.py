@@ -0,0 +1,166 @@
+"""
+Offline end-to-end benchmark for POST /analyze using stub LLM and search backends.
+
+Run from the repository root:
+    python -m python_agents.benchmarks.pipeline_benchmark --concurrency 1 2 4 --output bench_results.json
+
+Measures request latency and throughput at each concurrency level, time spent
+in each pipeline stage, parser throughput and memory growth, and writes the
+results as JSON so runs can be compared over time.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+from . import stubs
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(durations: List[float]) -> Dict:
+    """Latency summary in milliseconds."""
+    return {
+        'count': len(durations),
+        'avg_ms': 1000 * statistics.mean(durations),
+        'p50_ms': 1000 * percentile(durations, 0.5),
+        'p95_ms': 1000 * percentile(durations, 0.95),
+        'max_ms': 1000 * max(durations)
+    }
+
+
+def instrument_stages(manager_cls, timings: Dict[str, List[float]]) -> None:
+    """Record the wall time of every analyst stage and synthesis call."""
+    run_stage = manager_cls.run_stage
+    synthesize = manager_cls.synthesize
+
+    def timed_run_stage(self, stage, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return run_stage(self, stage, *args, **kwargs)
+        finally:
+            timings[stage].append(time.perf_counter() - start)
+
+    def timed_synthesize(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return synthesize(self, *args, **kwargs)
+        finally:
+            timings['manager'].append(time.perf_counter() - start)
+
+    manager_cls.run_stage = timed_run_stage
+    manager_cls.synthesize = timed_synthesize
+
+
+def run_level(client, concurrency: int, requests_per_worker: int, tag: str) -> Dict:
+    """Fire concurrency * requests_per_worker distinct analyses and time them."""
+    durations = []
+
+    def one(index: int) -> None:
+        start = time.perf_counter()
+        response = client.post("/analyze", json={'product_name': f"{tag} product {index}", 'context': "benchmark"})
+        response.raise_for_status()
+        durations.append(time.perf_counter() - start)
+
+    total = concurrency * requests_per_worker
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    result = summarize(durations)
+    result['concurrency'] = concurrency
+    result['throughput_rps'] = total / elapsed
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=3, help="requests per worker at each level")
+    parser.add_argument('--llm-latency', type=float, default=0.2)
+    parser.add_argument('--search-latency', type=float, default=0.05)
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args()
+
+    stubs.install(args.llm_latency, args.search_latency)
+    os.environ['RESEARCH_POOL_SIZE'] = str(max(args.concurrency))
+    os.environ['JOB_MAX_WORKERS'] = str(max(args.concurrency))
+    os.environ.pop('CACHE_DB_PATH', None)
+    os.environ['REPORT_DB_PATH'] = ':memory:'
+
+    tracemalloc.start()
+    from fastapi.testclient import TestClient
+    from src.api import main as api
+    from ..src.agents.research_manager import ResearchManager
+    from .parsing_benchmark import run as run_parsing
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    instrument_stages(ResearchManager, timings)
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'levels': []
+    }
+    with TestClient(api.app) as client:
+        startup = time.perf_counter()
+        client.get("/ready").raise_for_status()
+        results['ready_ms'] = 1000 * (time.perf_counter() - startup)
+
+        # Warm-up request so one-off allocations do not count as growth
+        client.post("/analyze", json={'product_name': "warm-up", 'context': ""}).raise_for_status()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        for index, concurrency in enumerate(args.concurrency):
+            results['levels'].append(run_level(client, concurrency, args.requests, f"level{index}"))
+
+        start = time.perf_counter()
+        client.post("/analyze", json={'product_name': "level0 product 0", 'context': "benchmark"}).raise_for_status()
+        results['cache_hit_ms'] = 1000 * (time.perf_counter() - start)
+
+        memory_after = tracemalloc.get_traced_memory()[0]
+
+    results['stages'] = {stage: summarize(values) for stage, values in timings.items()}
+    results['parser'] = run_parsing(blocks=200, repeat=3)
+    results['memory'] = {
+        'before_bytes': memory_before,
+        'after_bytes': memory_after,
+        'growth_bytes': memory_after - memory_before
+    }
+    results['stub_calls'] = dict(stubs.CALLS)
+    tracemalloc.stop()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for level in results['levels']:
+        print(f"concurrency={level['concurrency']}: p50={level['p50_ms']:.0f}ms "
+              f"p95={level['p95_ms']:.0f}ms throughput={level['throughput_rps']:.2f} req/s")
+    for stage, summary in results['stages'].items():
+        print(f"stage {stage}: avg={summary['avg_ms']:.0f}ms")
+    print(f"cache hit: {results['cache_hit_ms']:.1f}ms, memory growth: {results['memory']['growth_bytes']} bytes")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Cold-start benchmark for the API: import time and time to first response.
+
+Run from the repository root:
+    python -m python_agents.benchmarks.startup_benchmark --runs 5 --output startup_results.json
+
+Each run starts a fresh interpreter, imports src.api.main, enters the app
+lifespan and times the first /health response, readiness and the first
+/analyze, for every POOL_WARMUP mode. By default crewai and the search tool
+are replaced by the offline stubs, which import instantly, so the numbers
+isolate the API's own start-up cost; pass --real to measure with the
+installed dependencies and real API keys.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from .pipeline_benchmark import git_commit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The stubs stand in for crewai, so agent code being imported is tracked directly
+HEAVY_MODULES = ('crewai', 'crewai_tools', 'requests', 'openai', 'google.generativeai', 'litellm',
+                 'python_agents.src.agents.base_agent')
+
+# Executed in a fresh interpreter; prints one JSON line of timings
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+skip = ()
+if {stub!r}:
+    from python_agents.benchmarks import stubs
+    stubs.install({llm_latency!r}, {search_latency!r})
+    skip = ('crewai', 'crewai_tools')
+import src.api.main as api
+imported = time.perf_counter()
+heavy = [name for name in {heavy!r} if name in sys.modules and name not in skip]
+from fastapi.testclient import TestClient
+with TestClient(api.app) as client:
+    started = time.perf_counter()
+    client.get("/health").raise_for_status()
+    first_response = time.perf_counter()
+    # Lazy pools only become ready on the first analysis
+    while {mode!r} != 'lazy' and client.get("/ready").status_code != 200:
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    client.post("/analyze", json={{'product_name': "startup benchmark", 'context': ""}}).raise_for_status()
+    analyzed = time.perf_counter()
+    if {mode!r} == 'lazy':
+        ready = analyzed
+print(json.dumps({{
+    'import_ms': 1000 * (imported - start),
+    'startup_ms': 1000 * (started - start),
+    'first_response_ms': 1000 * (first_response - start),
+    'ready_ms': 1000 * (ready - start),
+    'first_analysis_ms': 1000 * (analyzed - start),
+    'heavy_modules_at_import': heavy
+}}))
+"""
+
+
+def run_once(mode: str, args) -> dict:
+    """Time one cold start in a fresh interpreter with the given POOL_WARMUP mode."""
+    code = CHILD.format(root=REPO_ROOT, mode=mode, stub=not args.real, llm_latency=args.llm_latency,
+                        search_latency=args.search_latency, heavy=HEAVY_MODULES)
+    env = dict(os.environ, POOL_WARMUP=mode)
+    env.pop('CACHE_DB_PATH', None)
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, '-c', code], env=env, cwd=REPO_ROOT, text=True,
+                                     stderr=subprocess.DEVNULL, timeout=args.timeout)
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_ms'] = 1000 * (time.perf_counter() - start)
+    return result
+
+
+def summarize(runs: list) -> dict:
+    """Median of every timing across runs."""
+    summary = {key: statistics.median(run[key] for run in runs) for key in runs[0] if key.endswith('_ms')}
+    summary['heavy_modules_at_import'] = runs[0]['heavy_modules_at_import']
+    summary['runs'] = len(runs)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', nargs='+', default=['blocking', 'background', 'lazy'])
+    parser.add_argument('--real', action='store_true', help="use installed crewai and real providers")
+    parser.add_argument('--llm-latency', type=float, default=0.05)
+    parser.add_argument('--search-latency', type=float, default=0.01)
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per cold start")
+    parser.add_argument('--output', default='startup_results.json')
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'config': vars(args),
+        'modes': {}
+    }
+    for mode in args.modes:
+        results['modes'][mode] = summarize([run_once(mode, args) for _ in range(args.runs)])
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for mode, summary in results['modes'].items():
+        print(f"{mode}: import={summary['import_ms']:.0f}ms first_response={summary['first_response_ms']:.0f}ms "
+              f"ready={summary['ready_ms']:.0f}ms first_analysis={summary['first_analysis_ms']:.0f}ms "
+              f"process={summary['process_ms']:.0f}ms")
+    print(f"heavy modules loaded by import: {results['modes'][args.modes[0]]['heavy_modules_at_import'] or 'none'}")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
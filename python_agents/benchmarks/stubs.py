@@ -0,0 +1,131 @@
+"""
+Deterministic stand-ins for the crewai LLM/crew runtime and the Serper search tool.
+
+install() registers fake ``crewai`` and ``crewai_tools`` modules so the agents
+package can be imported and exercised without network access or API keys. The
+stubs sleep for a configurable latency and return reports containing
+CHART_DATA/TABLE_DATA markers, so orchestration, caching and parsing costs are
+measured exactly as in production while the remote calls are replaced.
+"""
+import hashlib
+import os
+import sys
+import time
+import types
+
+LATENCY = {'llm': 0.2, 'search': 0.05}
+# Per-model LLM latency overrides, e.g. to exercise hedging between providers
+MODEL_LATENCY = {}
+CALLS = {'llm': 0, 'search': 0}
+
+
+def stub_report(seed: str, points: int = 10) -> str:
+    """Build a deterministic analyst report for a seed string."""
+    base = int(hashlib.sha1(seed.encode()).hexdigest()[:6], 16) % 100
+    lines = [f"## Findings for {seed[:60]}", "", "Key qualitative insights. " * 20, ""]
+    lines.append('[CHART_DATA type=line title="Market Growth Trend"]')
+    lines.append("Years:")
+    lines.extend(f"- {2015 + i}: ${base + i * 5}M" for i in range(points))
+    lines.append("[/CHART_DATA]")
+    lines.append('[CHART_DATA type=pie title="Market Share Distribution"]')
+    lines.extend(f"- Company {chr(65 + i)}: {100 // points}%" for i in range(points))
+    lines.append("[/CHART_DATA]")
+    lines.append('[TABLE_DATA title="Competitor Comparison"]')
+    lines.append("| Competitor | Market Share | Satisfaction |")
+    lines.append("|---|---|---|")
+    lines.extend(f"| Company {chr(65 + i)} | {100 // points}% | {7 + i / 10} |" for i in range(points))
+    lines.append("[/TABLE_DATA]")
+    return "\n".join(lines)
+
+
+class BaseLLM:
+    def __init__(self, model=None, temperature=None, **kwargs):
+        self.model = model
+        self.temperature = temperature
+        self.stop = []
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_stop_words(self):
+        return True
+
+    def get_context_window_size(self):
+        return 8192
+
+
+class LLM(BaseLLM):
+    def __init__(self, model=None, api_key=None, **kwargs):
+        super().__init__(model=model, temperature=kwargs.get('temperature'))
+        self.api_key = api_key or "stub"
+
+    def call(self, messages, *args, **kwargs):
+        CALLS['llm'] += 1
+        time.sleep(MODEL_LATENCY.get(self.model, LATENCY['llm']))
+        return ""
+
+
+class Agent:
+    def __init__(self, role, goal, backstory, tools=None, llm=None, **kwargs):
+        self.role = role
+        self.goal = goal
+        self.backstory = backstory
+        self.tools = tools or []
+        self.llm = llm
+
+
+class Task:
+    def __init__(self, description, agent=None, expected_output="", **kwargs):
+        self.description = description
+        self.agent = agent
+        self.expected_output = expected_output
+
+
+class Crew:
+    def __init__(self, agents, tasks, **kwargs):
+        self.agents = agents
+        self.tasks = tasks
+
+    def kickoff(self):
+        output = ""
+        for task in self.tasks:
+            topic = task.description.strip().splitlines()[0]
+            for tool in task.agent.tools:
+                tool._run(search_query=topic)
+            task.agent.llm.call([{'role': 'user', 'content': task.description}])
+            output = stub_report(f"{task.agent.role}: {topic}")
+        return output
+
+
+class SerperDevTool:
+    def __init__(self, api_key=None, **kwargs):
+        self.api_key = api_key
+
+    def _run(self, **kwargs):
+        CALLS['search'] += 1
+        time.sleep(LATENCY['search'])
+        query = kwargs.get('search_query') or kwargs.get('query') or ""
+        return {'organic': [{'title': f"Result for {query}", 'snippet': query}]}
+
+    def run(self, **kwargs):
+        return self._run(**kwargs)
+
+
+def install(llm_latency: float = 0.2, search_latency: float = 0.05) -> None:
+    """Register the stub modules and dummy API keys. Call before importing agents."""
+    LATENCY['llm'] = llm_latency
+    LATENCY['search'] = search_latency
+    crewai = types.ModuleType('crewai')
+    crewai.LLM, crewai.Agent, crewai.Task, crewai.Crew = LLM, Agent, Task, Crew
+    crewai_tools = types.ModuleType('crewai_tools')
+    crewai_tools.SerperDevTool = SerperDevTool
+    llms = types.ModuleType('crewai.llms')
+    base_llm = types.ModuleType('crewai.llms.base_llm')
+    base_llm.BaseLLM = BaseLLM
+    crewai.llms, llms.base_llm = llms, base_llm
+    sys.modules['crewai'] = crewai
+    sys.modules['crewai.llms'] = llms
+    sys.modules['crewai.llms.base_llm'] = base_llm
+    sys.modules['crewai_tools'] = crewai_tools
+    os.environ.setdefault('GEMINI_API_KEY', 'stub')
+    os.environ.setdefault('SERPER_API_KEY', 'stub')
@@ -1,10 +1,31 @@
 """
 Package initialization for agents
+
+Agent classes are imported on first access so that importing a submodule
+(the API imports the pool, caches and metrics) does not load crewai and the
+provider SDKs until an agent is actually built.
 """
-from .base_agent import BaseAgent
-from .market_analyst import MarketAnalyst
-from .consumer_analyst import ConsumerAnalyst
-from .industry_analyst import IndustryAnalyst
-from .research_manager import ResearchManager
+import importlib
+
+_LAZY_IMPORTS = {
+    'BaseAgent': '.base_agent',
+    'MarketAnalyst': '.market_analyst',
+    'ConsumerAnalyst': '.consumer_analyst',
+    'IndustryAnalyst': '.industry_analyst',
+    'ResearchManager': '.research_manager',
+}
+
+__all__ = ['BaseAgent', 'MarketAnalyst', 'ConsumerAnalyst', 'IndustryAnalyst', 'ResearchManager']
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['MarketAnalyst', 'ConsumerExpert', 'IndustrySpecialist', 'ResearchManager'] 
\ No newline at end of file
+def __dir__():
+    return sorted(list(globals()) + __all__)
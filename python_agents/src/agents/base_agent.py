@@ -5,7 +5,9 @@ import logging
 import re
 import json
 from .exceptions import LLMError
-from crewai_tools import SerperDevTool
+from .hedging import hedge_policy
+from .managed_llm import ManagedLLM
+from .tools import CachedSerperDevTool
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -16,6 +18,9 @@ logger = logging.getLogger(__name__)
 class BaseAgent:
     """Base class for all agents to eliminate code duplication."""
     
+    # CHART_DATA/TABLE_DATA instructions appended to the agent's task prompts
+    output_format = ""
+
     def __init__(self, role: str, goal: str, backstory: str):
         self.role = role
         self.goal = goal
@@ -25,33 +30,45 @@ class BaseAgent:
         self._tools = []
 
     def create_llm(self) -> LLM:
-        """Create and configure LLM instance."""
+        """Create and configure LLM instance.
+
+        Calls are rate limited per provider. When the role's hedge policy names
+        a secondary model, slow calls are hedged to it and errors fail over to it.
+        """
         if not self._llm:
-              retry_strategy = Retry(
-                total=3,
-                status_forcelist=[429, 500, 502, 503, 504],
-                backoff_factor=0.5,
-                connect=3,
-                read=3,
-            )
-              adapter = HTTPAdapter(max_retries=retry_strategy)
-              http = requests.Session()
-              http.mount("https://", adapter)
-              http.mount("http://", adapter)
-              self._llm = LLM(
-                    model="gemini/gemini-2.0-flash-exp",
-                    temperature=0.7,
-                    max_tokens=1200,
-                    top_p=1,
-                    frequency_penalty=0,
-                    presence_penalty=0,
-                    verbose=True,
-                    http_client=http,
-                    api_key=os.getenv("GEMINI_API_KEY")
-                )
-              if not self._llm.api_key:
+              policy = hedge_policy(self.role)
+              primary = self._build_llm(policy.model)
+              if policy.model.startswith("gemini/") and not primary.api_key:
                     raise LLMError("GEMINI_API_KEY is not set or invalid")
+              secondary = self._build_llm(policy.secondary) if policy.enabled else None
+              self._llm = ManagedLLM(self.role, policy, primary, secondary)
         return self._llm
+
+    def _build_llm(self, model: str) -> LLM:
+        """Create one provider LLM; non-Gemini providers read their key from the environment."""
+        # 429s are left to the shared rate limiter so throttled agents back off together
+        retry_strategy = Retry(
+            total=3,
+            status_forcelist=[500, 502, 503, 504],
+            backoff_factor=0.5,
+            connect=3,
+            read=3,
+        )
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        http = requests.Session()
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+        return LLM(
+            model=model,
+            temperature=0.7,
+            max_tokens=1200,
+            top_p=1,
+            frequency_penalty=0,
+            presence_penalty=0,
+            verbose=True,
+            http_client=http,
+            api_key=os.getenv("GEMINI_API_KEY") if model.startswith("gemini/") else None
+        )
     
     def create_tools(self):
         """Create and configure tools for the agent"""
@@ -60,7 +77,7 @@ class BaseAgent:
             if not serper_api_key:
                raise Exception("SERPER_API_KEY not set")
             self._tools = [
-                SerperDevTool(api_key=serper_api_key)
+                CachedSerperDevTool(api_key=serper_api_key)
             ]
           
         return self._tools
@@ -106,6 +123,7 @@ class BaseAgent:
                 {
                     'type': 'bar|line|pie',
                     'title': 'Chart title',
+                    'unit': {'type': 'currency|percent|number', 'currency': 'USD', 'scale': 'M', 'multiplier': 1e6},
                     'data': {
                         'labels': [...],
                         'datasets': [{
@@ -1,75 +1,197 @@
+import heapq
 import json
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from .exceptions import CacheError
 
 class Cache:
-    """Simple in-memory cache with TTL support."""
-    
-    def __init__(self, ttl_hours: int = 24):
-        self._cache: Dict[str, Dict] = {}
-        self._ttl = timedelta(hours=ttl_hours)
+    """Bounded, thread-safe in-memory LRU cache with TTL support.
+
+    Entries are evicted least-recently-used first once either ``max_entries``
+    or ``max_bytes`` is exceeded. Expiry uses a monotonic clock and a min-heap
+    of deadlines that is swept on every write, so expired entries are dropped
+    even if they are never read again.
+
+    With ``stale_grace_hours`` expired entries are kept for that much longer
+    and can still be read through ``get_stale`` for stale-while-revalidate
+    serving; ``get`` treats them as misses either way.
+    """
+
+    def __init__(self, ttl_hours: float = 24, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, stale_grace_hours: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries is None:
+            max_entries = int(os.getenv("CACHE_MAX_SIZE", 1000))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        self._ttl = ttl_hours * 3600
+        self._grace = max(0.0, stale_grace_hours * 3600)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.RLock()
+        # key -> (value, expires_at, size); ordered from least to most recently used
+        self._cache: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        # (expires_at + grace, key) deadlines; may hold stale items for overwritten keys
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        """Approximate the memory footprint of a value by its JSON size."""
+        return len(json.dumps(value, default=str))
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._cache.pop(key)
+        self._bytes -= size
+
+    def _sweep(self, now: float) -> None:
+        """Drop every entry whose deadline, including the stale grace window, has passed."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Skip stale deadlines left behind by overwritten keys
+            if entry is not None and entry[1] + self._grace == deadline:
+                self._drop(key)
+                self._expirations += 1
+        # Keep the heap proportional to the live entries
+        if len(heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [(entry[1] + self._grace, key) for key, entry in self._cache.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within bounds."""
+        while self._cache and (len(self._cache) > self._max_entries or self._bytes > self._max_bytes):
+            key = next(iter(self._cache))
+            self._drop(key)
+            self._evictions += 1
 
     def get(self, key: str) -> Optional[Dict]:
         """Get value from cache if not expired."""
         try:
-            if key not in self._cache:
-                return None
-                
-            entry = self._cache[key]
-            if datetime.now() - entry['timestamp'] > self._ttl:
-                del self._cache[key]
-                return None
-                
-            return entry['data']
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry is None:
+                    self._misses += 1
+                    return None
+
+                now = self._clock()
+                if now >= entry[1]:
+                    # Expired entries stay readable through get_stale until the grace window ends
+                    if now >= entry[1] + self._grace:
+                        self._drop(key)
+                        self._expirations += 1
+                    self._misses += 1
+                    return None
+
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return entry[0]
         except Exception as e:
             raise CacheError(f"Error retrieving from cache: {str(e)}")
 
-    def set(self, key: str, value: Dict) -> None:
-        """Set value in cache with current timestamp."""
+    def get_stale(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """Get an expired value still inside the stale grace window.
+
+        Returns:
+            tuple: (value, seconds since it expired), or None if the entry is
+            absent, still fresh, or past the grace window
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expired_for = self._clock() - entry[1]
+            if expired_for < 0 or expired_for >= self._grace:
+                return None
+            self._stale_hits += 1
+            return entry[0], expired_for
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Seconds until an entry expires, or None if it is absent or expired.
+
+        Does not count as a hit or refresh the entry's LRU position.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            remaining = entry[1] - self._clock()
+            return remaining if remaining > 0 else None
+
+    def set(self, key: str, value: Dict, ttl_hours: Optional[float] = None) -> None:
+        """Set value in cache, evicting expired and least recently used entries.
+
+        Args:
+            ttl_hours (float): Overrides the cache-wide TTL for this entry
+        """
         try:
-            self._cache[key] = {
-                'data': value,
-                'timestamp': datetime.now()
-            }
+            size = self._sizeof(value)
+            ttl = self._ttl if ttl_hours is None else ttl_hours * 3600
+            with self._lock:
+                now = self._clock()
+                self._sweep(now)
+                if key in self._cache:
+                    self._drop(key)
+                if size > self._max_bytes or ttl <= 0:
+                    return
+                expires_at = now + ttl
+                self._cache[key] = (value, expires_at, size)
+                self._bytes += size
+                heapq.heappush(self._expiry_heap, (expires_at + self._grace, key))
+                self._evict()
         except Exception as e:
             raise CacheError(f"Error setting cache: {str(e)}")
 
     def clear(self) -> None:
         """Clear all cached entries."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
 
     def remove(self, key: str) -> None:
         """Remove specific key from cache."""
         try:
-            if key in self._cache:
-                del self._cache[key]
+            with self._lock:
+                if key in self._cache:
+                    self._drop(key)
         except Exception as e:
             raise CacheError(f"Error removing from cache: {str(e)}")
 
     def cleanup_expired(self) -> None:
         """Remove all expired entries."""
         try:
-            now = datetime.now()
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if now - entry['timestamp'] > self._ttl
-            ]
-            for key in expired_keys:
-                del self._cache[key]
+            with self._lock:
+                self._sweep(self._clock())
         except Exception as e:
             raise CacheError(f"Error cleaning up cache: {str(e)}")
 
     def get_stats(self) -> Dict:
         """Get cache statistics."""
-        try:
+        with self._lock:
+            lookups = self._hits + self._misses
             return {
                 'total_entries': len(self._cache),
-                'expired_entries': len([
-                    1 for entry in self._cache.values()
-                    if datetime.now() - entry['timestamp'] > self._ttl
-                ]),
-                'ttl_hours': self._ttl.total_seconds() / 3600
+                'total_bytes': self._bytes,
+                'max_entries': self._max_entries,
+                'max_bytes': self._max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'stale_hits': self._stale_hits,
+                'evictions': self._evictions,
+                # Entries removed because their TTL (and grace window) passed
+                'expired_entries': self._expirations,
+                'ttl_hours': self._ttl / 3600,
+                'stale_grace_hours': self._grace / 3600
             }
-        except Exception as e:
-            raise CacheError(f"Error getting cache stats: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,124 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from .parsing import parse_structured_output
+from .values import unit_label
+
+_WHITESPACE = re.compile(r"\s+")
+_DIGIT = re.compile(r"\d")
+
+# Lines kept first when a section must be trimmed: headings and lines with numbers
+_PRIORITY_HEADING = 0
+_PRIORITY_NUMERIC = 1
+_PRIORITY_BULLET = 2
+_PRIORITY_TEXT = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token for English)."""
+    return (len(text) + 3) // 4
+
+
+def _line_priority(line: str) -> int:
+    stripped = line.lstrip()
+    if stripped.startswith('#'):
+        return _PRIORITY_HEADING
+    if _DIGIT.search(stripped):
+        return _PRIORITY_NUMERIC
+    if stripped[:1] in ('-', '*', '•') or stripped[:2].rstrip('.').isdigit():
+        return _PRIORITY_BULLET
+    return _PRIORITY_TEXT
+
+
+def _structured_lines(charts: List[Dict], tables: List[Dict]) -> List[str]:
+    """Render parsed charts and tables as one compact JSON line each."""
+    lines = []
+    for chart in charts:
+        data = dict(zip(chart['data']['labels'], chart['data']['datasets'][0]['data']))
+        rendered = {'chart': chart['title'], 'data': data}
+        unit = chart.get('unit') or {}
+        # Values are rescaled to the chart's currency and magnitude, so name them
+        if unit.get('currency') or unit.get('scale'):
+            rendered['unit'] = unit_label(unit)
+        lines.append(json.dumps(rendered, separators=(',', ':')))
+    for table in tables:
+        rows = [[row.get(header, "") for header in table['headers']] for row in table['rows']]
+        lines.append(json.dumps({'table': table['title'], 'headers': table['headers'], 'rows': rows},
+                                separators=(',', ':')))
+    return lines
+
+
+def _allocate(needs: Dict[str, int], budget: int) -> Dict[str, int]:
+    """Split budget across sections, giving unused share of small sections to larger ones."""
+    allocation = {}
+    remaining = dict(needs)
+    while remaining:
+        share = budget // len(remaining)
+        satisfied = {name: need for name, need in remaining.items() if need <= share}
+        if not satisfied:
+            for name in remaining:
+                allocation[name] = share
+            break
+        for name, need in satisfied.items():
+            allocation[name] = need
+            budget -= need
+            del remaining[name]
+    return allocation
+
+
+def _trim(lines: List[str], budget: int) -> List[str]:
+    """Keep the highest-priority lines that fit the budget, in their original order."""
+    costs = [estimate_tokens(line) + 1 for line in lines]
+    if sum(costs) <= budget:
+        return lines
+    order = sorted(range(len(lines)), key=lambda i: (_line_priority(lines[i]), i))
+    keep = set()
+    used = 0
+    for i in order:
+        if used + costs[i] <= budget:
+            keep.add(i)
+            used += costs[i]
+    return [line for i, line in enumerate(lines) if i in keep]
+
+
+def compact_for_synthesis(stage_results: Dict[str, str],
+                          budget_tokens: Optional[int] = None) -> Tuple[Dict[str, str], Dict]:
+    """Compact analyst outputs to fit the synthesis prompt within a token budget.
+
+    Marker blocks become one-line JSON, lines repeated within or across
+    sections are dropped, and sections still over their share of the budget
+    are trimmed extractively, keeping headings and lines with figures first.
+
+    Returns:
+        tuple: (compacted outputs keyed by stage, token counts before and after)
+    """
+    if budget_tokens is None:
+        budget_tokens = int(os.getenv("SYNTHESIS_TOKEN_BUDGET", 3000))
+
+    seen = set()
+    sections = {}
+    for stage, output in stage_results.items():
+        content, charts, tables = parse_structured_output(output or "")
+        lines = []
+        for line in content.splitlines():
+            normalized = _WHITESPACE.sub(" ", line).strip().casefold()
+            if not normalized:
+                continue
+            if not normalized.startswith('#'):
+                if normalized in seen:
+                    continue
+                seen.add(normalized)
+            lines.append(line.rstrip())
+        sections[stage] = _structured_lines(charts, tables) + lines
+
+    needs = {stage: sum(estimate_tokens(line) + 1 for line in lines) for stage, lines in sections.items()}
+    allocation = _allocate(needs, budget_tokens)
+    compacted = {stage: "\n".join(_trim(lines, allocation[stage])) for stage, lines in sections.items()}
+
+    stats = {
+        'budget_tokens': budget_tokens,
+        'tokens_before': sum(estimate_tokens(output or "") for output in stage_results.values()),
+        'tokens_after': sum(estimate_tokens(text) for text in compacted.values())
+    }
+    return compacted, stats
@@ -0,0 +1,311 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from .cache import Cache
+from .exceptions import CacheError
+
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    """Persistent cache tier backed by SQLite in WAL mode.
+
+    The database file can be shared by several worker processes: WAL lets
+    readers proceed while one writer commits. Expiry uses wall-clock time
+    because deadlines must be comparable across processes and restarts.
+    When the stored payload exceeds ``max_bytes`` the least recently
+    accessed entries are compacted away. Expired entries are kept for
+    ``stale_grace_hours`` so ``get_stale`` can still serve them.
+
+    Hits only record their access time when the stored one is older than
+    ``touch_seconds``, so concurrent readers rarely need the write lock.
+    Compaction runs when this process's running estimate of the stored
+    bytes passes ``max_bytes``, and every ``compact_every`` writes to catch
+    what other processes wrote, rather than summing the table on each set.
+    """
+
+    def __init__(self, path: str, ttl_hours: float = 24, max_bytes: Optional[int] = None,
+                 stale_grace_hours: float = 0, touch_seconds: Optional[float] = None,
+                 compact_every: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("CACHE_DB_MAX_BYTES", 1024 * 1024 * 1024))
+        if touch_seconds is None:
+            touch_seconds = float(os.getenv("CACHE_DB_TOUCH_SECONDS", 60))
+        if compact_every is None:
+            compact_every = int(os.getenv("CACHE_DB_COMPACT_EVERY", 100))
+        self.path = path
+        self._ttl = ttl_hours * 3600
+        self._grace = max(0.0, stale_grace_hours * 3600)
+        self._max_bytes = max_bytes
+        self._touch_seconds = touch_seconds
+        self._compact_every = max(1, compact_every)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # Stored bytes as of the last compaction plus every payload written since;
+        # replacements are counted twice, which only brings compaction forward
+        self._estimated_bytes = 0
+        self._writes_since_compact = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS entries (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        expires_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )"""
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+                self._estimated_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except sqlite3.Error as e:
+            raise CacheError(f"Error opening cache database: {str(e)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get a value and its wall-clock expiry time if present and not expired."""
+        try:
+            now = time.time()
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                with self._stats_lock:
+                    self._misses += 1
+                return None
+            # A recent access time is close enough for LRU and saves a write transaction
+            if now - row[2] >= self._touch_seconds:
+                with conn:
+                    conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            with self._stats_lock:
+                self._hits += 1
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, ValueError) as e:
+            raise CacheError(f"Error retrieving from disk cache: {str(e)}")
+
+    def get_stale(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get an expired value still inside the stale grace window with its seconds since expiry."""
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expired_for = time.time() - row[1]
+            if expired_for < 0 or expired_for >= self._grace:
+                return None
+            return json.loads(row[0]), expired_for
+        except (sqlite3.Error, ValueError) as e:
+            raise CacheError(f"Error retrieving from disk cache: {str(e)}")
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Seconds until an entry expires, or None if it is absent or expired."""
+        try:
+            row = self._connect().execute(
+                "SELECT expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise CacheError(f"Error reading disk cache: {str(e)}")
+        if row is None:
+            return None
+        remaining = row[0] - time.time()
+        return remaining if remaining > 0 else None
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get value from cache if not expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Dict, ttl_hours: Optional[float] = None) -> None:
+        """Persist a value, compacting the store if it may have grown past max_bytes."""
+        try:
+            payload = json.dumps(value, default=str)
+            ttl = self._ttl if ttl_hours is None else ttl_hours * 3600
+            now = time.time()
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now + ttl, now)
+                )
+            with self._stats_lock:
+                self._estimated_bytes += len(payload)
+                self._writes_since_compact += 1
+                due = (self._estimated_bytes > self._max_bytes
+                       or self._writes_since_compact >= self._compact_every)
+            if due:
+                self.compact()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            raise CacheError(f"Error setting disk cache: {str(e)}")
+
+    def compact(self) -> None:
+        """Drop expired entries, then least recently accessed ones until under max_bytes."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time() - self._grace,))
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total <= self._max_bytes:
+                    self._reset_estimate(total)
+                    return
+                # Trim to 90% so a burst of writes does not compact on every call
+                target = total - int(self._max_bytes * 0.9)
+                freed = 0
+                evicted = []
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    if freed >= target:
+                        break
+                    evicted.append((key,))
+                    freed += size
+                conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+            self._reset_estimate(total - freed)
+            with self._stats_lock:
+                self._evictions += len(evicted)
+            logger.info(f"Compacted disk cache: evicted {len(evicted)} entries ({freed} bytes)")
+        except sqlite3.Error as e:
+            raise CacheError(f"Error compacting disk cache: {str(e)}")
+
+    def _reset_estimate(self, total: int) -> None:
+        with self._stats_lock:
+            self._estimated_bytes = total
+            self._writes_since_compact = 0
+
+    def clear(self) -> None:
+        """Clear all cached entries."""
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            raise CacheError(f"Error clearing disk cache: {str(e)}")
+
+    def remove(self, key: str) -> None:
+        """Remove specific key from cache."""
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            raise CacheError(f"Error removing from disk cache: {str(e)}")
+
+    def cleanup_expired(self) -> None:
+        """Remove all entries past their expiry and grace window."""
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time() - self._grace,))
+        except sqlite3.Error as e:
+            raise CacheError(f"Error cleaning up disk cache: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics. Hit/miss counters are per process."""
+        try:
+            entries, total_bytes = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise CacheError(f"Error getting disk cache stats: {str(e)}")
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                'path': self.path,
+                'total_entries': entries,
+                'total_bytes': total_bytes,
+                'max_bytes': self._max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'ttl_hours': self._ttl / 3600,
+                'stale_grace_hours': self._grace / 3600
+            }
+
+
+class TieredCache:
+    """In-memory Cache in front of a shared DiskCache.
+
+    Reads fall through to disk on a memory miss and promote the entry for its
+    remaining lifetime; writes go to both tiers.
+    """
+
+    def __init__(self, memory: Cache, disk: DiskCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get value from memory, falling back to disk."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        self.memory.set(key, value, ttl_hours=(expires_at - time.time()) / 3600)
+        return value
+
+    def get_stale(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """Expired value still inside the grace window in either tier, with its seconds since expiry."""
+        stale = self.memory.get_stale(key)
+        return stale if stale is not None else self.disk.get_stale(key)
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Seconds until an entry expires in either tier, or None."""
+        remaining = self.memory.ttl_remaining(key)
+        return remaining if remaining is not None else self.disk.ttl_remaining(key)
+
+    def set(self, key: str, value: Dict, ttl_hours: Optional[float] = None) -> None:
+        """Write value to both tiers."""
+        self.memory.set(key, value, ttl_hours=ttl_hours)
+        self.disk.set(key, value, ttl_hours=ttl_hours)
+
+    def clear(self) -> None:
+        """Clear both tiers."""
+        self.memory.clear()
+        self.disk.clear()
+
+    def remove(self, key: str) -> None:
+        """Remove key from both tiers."""
+        self.memory.remove(key)
+        self.disk.remove(key)
+
+    def cleanup_expired(self) -> None:
+        """Remove expired entries from both tiers."""
+        self.memory.cleanup_expired()
+        self.disk.cleanup_expired()
+
+    def get_stats(self) -> Dict:
+        """Memory tier statistics with the disk tier nested under 'disk'."""
+        stats = self.memory.get_stats()
+        stats['disk'] = self.disk.get_stats()
+        return stats
+
+
+def create_cache(ttl_hours: float = 24) -> Cache:
+    """Build the result cache, adding the disk tier when CACHE_DB_PATH is set.
+
+    CACHE_STALE_GRACE_HOURS keeps expired reports servable as stale for that long.
+    """
+    grace = float(os.getenv("CACHE_STALE_GRACE_HOURS", 0))
+    memory = Cache(ttl_hours=ttl_hours, stale_grace_hours=grace)
+    path = os.getenv("CACHE_DB_PATH")
+    if not path:
+        return memory
+    return TieredCache(memory, DiskCache(path, ttl_hours=ttl_hours, stale_grace_hours=grace))
@@ -12,4 +12,12 @@ class CacheError(Exception):
 
 class ValidationError(Exception):
     """Exception raised for input validation errors."""
-    pass 
\ No newline at end of file
+    pass
+
+class QueueFullError(Exception):
+    """Exception raised when a work queue cannot accept more jobs."""
+    pass
+
+class StoreError(Exception):
+    """Exception raised for report history store errors."""
+    pass
@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from .metrics import LLM_CALLS, LLM_FAILOVERS, LLM_HEDGE_WINS, LLM_HEDGES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini/gemini-2.0-flash-exp"
+
+# Per-role overrides of the default hedge policy. Synthesis is the longest and
+# most expensive call, so it only fails over instead of racing two providers.
+HEDGE_POLICIES: Dict[str, Dict[str, Any]] = {
+    'Research Manager': {'hedge': False}
+}
+
+
+@dataclass
+class HedgePolicy:
+    """How LLM calls for one role use a secondary provider.
+
+    When ``hedge`` is set and the primary has not answered within the
+    ``percentile`` of its recent latencies (``initial_delay`` seconds until
+    enough samples exist), the prompt is also sent to ``secondary`` and the
+    first answer wins. A primary failure always fails over to ``secondary``.
+    """
+    model: str = DEFAULT_MODEL
+    secondary: str = ""
+    hedge: bool = True
+    percentile: float = 0.95
+    initial_delay: float = 8.0
+    min_delay: float = 0.5
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.secondary) and self.secondary != self.model
+
+
+def hedge_policy(role: str) -> HedgePolicy:
+    """Resolve the policy for a role from env defaults, HEDGE_POLICIES and LLM_HEDGE_POLICIES.
+
+    LLM_HEDGE_POLICIES is a JSON object mapping role to overrides, e.g.
+    '{"Industry Analyst": {"percentile": 0.9}}'.
+    """
+    settings = {
+        'model': os.getenv("LLM_MODEL", DEFAULT_MODEL),
+        'secondary': os.getenv("LLM_SECONDARY_MODEL", ""),
+        'percentile': float(os.getenv("LLM_HEDGE_PERCENTILE", 0.95)),
+        'initial_delay': float(os.getenv("LLM_HEDGE_INITIAL_DELAY", 8.0))
+    }
+    settings.update(HEDGE_POLICIES.get(role, {}))
+    try:
+        overrides = json.loads(os.getenv("LLM_HEDGE_POLICIES", "") or "{}")
+    except json.JSONDecodeError as e:
+        logger.error(f"Ignoring invalid LLM_HEDGE_POLICIES: {str(e)}")
+        overrides = {}
+    settings.update(overrides.get(role, {}))
+    return HedgePolicy(**settings)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, model: str, fraction: float) -> Optional[float]:
+        """Latency at the given percentile, or None until min_samples calls have been seen."""
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Hedger:
+    """Run an LLM call against a primary provider with hedging and failover.
+
+    ``call`` runs blocking calls on a shared thread pool. A losing call that
+    has already started cannot be interrupted; its result is discarded, and
+    it still counts toward its model's latency window. ``acall`` applies the
+    same policy to coroutines on the caller's event loop, where the losing
+    call is cancelled.
+    """
+
+    def __init__(self, tracker: Optional[LatencyTracker] = None, max_workers: Optional[int] = None):
+        self.tracker = tracker if tracker is not None else LatencyTracker()
+        if max_workers is None:
+            max_workers = int(os.getenv("LLM_HEDGE_WORKERS", 16))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def delay(self, policy: HedgePolicy) -> float:
+        """Seconds to wait for the primary before hedging."""
+        observed = self.tracker.percentile(policy.model, policy.percentile)
+        if observed is None:
+            return policy.initial_delay
+        return max(policy.min_delay, observed)
+
+    def _submit(self, model: str, fn: Callable[[], Any]):
+        def timed():
+            start = time.perf_counter()
+            result = fn()
+            self.tracker.observe(model, time.perf_counter() - start)
+            return result
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, timed)
+
+    def _failover(self, role: str, policy: HedgePolicy, secondary: Callable[[], Any], error: BaseException) -> Any:
+        logger.error(f"{role} call to {policy.model} failed, failing over to {policy.secondary}: {str(error)}")
+        LLM_FAILOVERS.inc(role=role)
+        return self._submit(policy.secondary, secondary).result()
+
+    def call(self, role: str, policy: HedgePolicy, primary: Callable[[], Any],
+             secondary: Optional[Callable[[], Any]] = None) -> Any:
+        """Return the first successful answer from primary (or secondary, when hedged or failed over)."""
+        LLM_CALLS.inc(role=role)
+        if not policy.enabled or secondary is None:
+            return primary()
+
+        if not policy.hedge:
+            try:
+                return self._submit(policy.model, primary).result()
+            except Exception as e:
+                return self._failover(role, policy, secondary, e)
+
+        first = self._submit(policy.model, primary)
+        done, _ = wait([first], timeout=self.delay(policy))
+        if done:
+            error = first.exception()
+            if error is None:
+                return first.result()
+            return self._failover(role, policy, secondary, error)
+
+        LLM_HEDGES.inc(role=role)
+        second = self._submit(policy.secondary, secondary)
+        futures = {first: policy.model, second: policy.secondary}
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    LLM_HEDGE_WINS.inc(role=role, winner='secondary' if future is second else 'primary')
+                    return future.result()
+                error = future.exception()
+                logger.error(f"{role} call to {futures[future]} failed: {str(error)}")
+        raise error
+
+    async def _atimed(self, model: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        result = await fn()
+        self.tracker.observe(model, time.perf_counter() - start)
+        return result
+
+    async def _afailover(self, role: str, policy: HedgePolicy, secondary: Callable[[], Awaitable[Any]],
+                         error: BaseException) -> Any:
+        logger.error(f"{role} call to {policy.model} failed, failing over to {policy.secondary}: {str(error)}")
+        LLM_FAILOVERS.inc(role=role)
+        return await self._atimed(policy.secondary, secondary)
+
+    async def acall(self, role: str, policy: HedgePolicy, primary: Callable[[], Awaitable[Any]],
+                    secondary: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """Async form of call for coroutine factories; a losing call is cancelled."""
+        LLM_CALLS.inc(role=role)
+        if not policy.enabled or secondary is None:
+            return await primary()
+
+        if not policy.hedge:
+            try:
+                return await self._atimed(policy.model, primary)
+            except Exception as e:
+                return await self._afailover(role, policy, secondary, e)
+
+        first = asyncio.ensure_future(self._atimed(policy.model, primary))
+        done, _ = await asyncio.wait({first}, timeout=self.delay(policy))
+        if done:
+            error = first.exception()
+            if error is None:
+                return first.result()
+            return await self._afailover(role, policy, secondary, error)
+
+        LLM_HEDGES.inc(role=role)
+        second = asyncio.ensure_future(self._atimed(policy.secondary, secondary))
+        tasks = {first: policy.model, second: policy.secondary}
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    LLM_HEDGE_WINS.inc(role=role, winner='secondary' if task is second else 'primary')
+                    return task.result()
+                error = task.exception()
+                logger.error(f"{role} call to {tasks[task]} failed: {str(error)}")
+        raise error
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Hedge and failover rates per role since startup."""
+        stats = {}
+        for (role,), calls in LLM_CALLS.values().items():
+            hedges = LLM_HEDGES.value(role=role)
+            failovers = LLM_FAILOVERS.value(role=role)
+            stats[role] = {
+                'calls': calls,
+                'hedges': hedges,
+                'secondary_wins': LLM_HEDGE_WINS.value(role=role, winner='secondary'),
+                'failovers': failovers,
+                'hedge_rate': hedges / calls if calls else 0.0,
+                'failover_rate': failovers / calls if calls else 0.0
+            }
+        return stats
+
+
+hedger = Hedger()
@@ -0,0 +1,151 @@
+import os
+import random
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _singularize(word: str) -> str:
+    """Strip common English plural endings."""
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'ches', 'shes', 'xes', 'zes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def normalize_text(text: str) -> str:
+    """Casefold, drop punctuation, collapse whitespace and singularize each word."""
+    text = unicodedata.normalize('NFKC', text or "").casefold()
+    return " ".join(_singularize(word) for word in _NON_WORD.sub(" ", text).split())
+
+
+def normalize_product(product_name: str) -> str:
+    """Normalize a product name, also ignoring word breaks ("smart watch" == "smartwatches")."""
+    return normalize_text(product_name).replace(" ", "")
+
+
+def analysis_key(product_name: str, context: str = "") -> str:
+    """Normalized cache key for an analysis request."""
+    return f"{normalize_product(product_name)}:{normalize_text(context)}"
+
+
+class KeyIndex:
+    """Near-duplicate lookup over normalized cache keys plus hit-rate accounting.
+
+    Keys are MinHash-signed over character shingles and bucketed with LSH
+    banding, so finding a similar stored key only compares a few candidates.
+    A ``threshold`` of 0 disables near-duplicate matching.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, shingle_size: int = 3,
+                 bands: int = 16, rows: int = 4, max_keys: int = 10000, seed: int = 1):
+        if threshold is None:
+            threshold = float(os.getenv("CACHE_NEAR_DUPLICATE_THRESHOLD", 0))
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+        self.max_keys = max_keys
+        rng = random.Random(seed)
+        self._hash_params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                             for _ in range(bands * rows)]
+        self._lock = threading.Lock()
+        # key -> (signature, raw key of the request that stored it)
+        self._keys: "OrderedDict[str, Tuple[Tuple[int, ...], str]]" = OrderedDict()
+        self._buckets: List[Dict[Tuple[int, ...], set]] = [{} for _ in range(bands)]
+        self._lookups = 0
+        self._exact_hits = 0
+        self._normalized_hits = 0
+        self._near_duplicate_hits = 0
+
+    def _signature(self, key: str) -> Tuple[int, ...]:
+        size = self.shingle_size
+        padded = f" {key} "
+        shingles = {zlib.crc32(padded[i:i + size].encode()) for i in range(max(1, len(padded) - size + 1))}
+        return tuple(min((a * x + b) % _MERSENNE_PRIME for x in shingles) for a, b in self._hash_params)
+
+    def _bands(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _discard(self, key: str) -> None:
+        signature, _ = self._keys.pop(key)
+        for band, value in self._bands(signature) if signature else ():
+            bucket = self._buckets[band].get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][value]
+
+    def add(self, key: str, raw_key: str = "") -> None:
+        """Index a stored cache key."""
+        signature = self._signature(key) if self.threshold > 0 else ()
+        with self._lock:
+            if key in self._keys:
+                self._discard(key)
+            self._keys[key] = (signature, raw_key)
+            if signature:
+                for band, value in self._bands(signature):
+                    self._buckets[band].setdefault(value, set()).add(key)
+            while len(self._keys) > self.max_keys:
+                self._discard(next(iter(self._keys)))
+
+    def find_similar(self, key: str) -> Optional[str]:
+        """Return the most similar indexed key at or above the threshold, if any."""
+        if self.threshold <= 0:
+            return None
+        signature = self._signature(key)
+        with self._lock:
+            candidates = set()
+            for band, value in self._bands(signature):
+                candidates.update(self._buckets[band].get(value, ()))
+            best, best_score = None, self.threshold
+            for candidate in candidates:
+                if candidate == key:
+                    continue
+                other = self._keys[candidate][0]
+                score = sum(1 for a, b in zip(signature, other) if a == b) / len(signature)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            return best
+
+    def record_lookup(self, key: str, raw_key: str, result: str) -> None:
+        """Account for a lookup whose result is 'exact', 'near_duplicate' or 'miss'."""
+        with self._lock:
+            self._lookups += 1
+            if result == 'exact':
+                self._exact_hits += 1
+                stored = self._keys.get(key)
+                # The entry was stored under a different spelling: a hit only thanks to normalization
+                if stored is not None and stored[1] and stored[1] != raw_key:
+                    self._normalized_hits += 1
+            elif result == 'near_duplicate':
+                self._near_duplicate_hits += 1
+
+    def get_stats(self) -> Dict:
+        """Hit rates with and without normalization and near-duplicate matching."""
+        with self._lock:
+            lookups = self._lookups or 1
+            hits = self._exact_hits + self._near_duplicate_hits
+            return {
+                'indexed_keys': len(self._keys),
+                'near_duplicate_threshold': self.threshold,
+                'lookups': self._lookups,
+                'exact_hits': self._exact_hits,
+                'normalized_hits': self._normalized_hits,
+                'near_duplicate_hits': self._near_duplicate_hits,
+                'hit_rate': hits / lookups,
+                'hit_rate_without_near_duplicates': self._exact_hits / lookups,
+                'hit_rate_without_normalization': (self._exact_hits - self._normalized_hits) / lookups
+            }
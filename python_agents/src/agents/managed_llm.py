@@ -0,0 +1,44 @@
+from typing import Any, Optional
+from crewai.llms.base_llm import BaseLLM
+from .hedging import HedgePolicy, hedger
+from .rate_limit import get_limiter, provider_for_model
+
+class ManagedLLM(BaseLLM):
+    """Custom crewai LLM that rate limits, hedges and fails over provider calls.
+
+    Every call goes through its provider's shared adaptive limiter. When the
+    role's HedgePolicy names a secondary LLM, the hedger decides when it is
+    raced against the primary or used after a failure.
+    """
+
+    def __init__(self, role: str, policy: HedgePolicy, primary: BaseLLM, secondary: Optional[BaseLLM] = None):
+        super().__init__(model=primary.model, temperature=getattr(primary, 'temperature', None))
+        self.role = role
+        self.policy = policy
+        self.primary = primary
+        self.secondary = secondary
+
+    def _limited(self, llm: BaseLLM, messages: Any, args: tuple, kwargs: dict):
+        limiter = get_limiter(provider_for_model(llm.model))
+        return lambda: limiter.call(llm.call, messages, *args, **kwargs)
+
+    def _llms(self):
+        return [llm for llm in (self.primary, self.secondary) if llm is not None]
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        # Agents set stop words on the LLM they were given; pass them through
+        stop = getattr(self, 'stop', None)
+        if stop:
+            for llm in self._llms():
+                llm.stop = stop
+        secondary = self._limited(self.secondary, messages, args, kwargs) if self.secondary is not None else None
+        return hedger.call(self.role, self.policy, self._limited(self.primary, messages, args, kwargs), secondary)
+
+    def supports_function_calling(self) -> bool:
+        return all(llm.supports_function_calling() for llm in self._llms())
+
+    def supports_stop_words(self) -> bool:
+        return self.primary.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return min(llm.get_context_window_size() for llm in self._llms())
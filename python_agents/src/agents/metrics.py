@@ -0,0 +1,192 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Spans recorded for the current request, when a trace is active
+_current_trace: contextvars.ContextVar[Optional[List[Dict]]] = contextvars.ContextVar('trace', default=None)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonically increasing counter with optional labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def values(self) -> Dict[Tuple, float]:
+        """Current value of every label combination."""
+        with self._lock:
+            return dict(self._values)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+SPAN_DURATION = registry.histogram(
+    'research_span_duration_seconds', 'Duration of research pipeline spans', ('span', 'stage'))
+ANALYST_ERRORS = registry.counter(
+    'research_analyst_errors_total', 'Analyst stages that raised an error', ('stage',))
+CACHE_LOOKUPS = registry.counter(
+    'research_cache_lookups_total', 'Cache lookups by cache and result', ('cache', 'result'))
+CACHE_REFRESHES = registry.counter(
+    'research_cache_refreshes_total', 'Background report recomputations by trigger and result', ('trigger', 'result'))
+LLM_TOKENS = registry.counter(
+    'research_llm_tokens_total', 'LLM tokens consumed by stage and direction', ('stage', 'direction'))
+SYNTHESIS_TOKENS = registry.counter(
+    'research_synthesis_input_tokens_total', 'Estimated synthesis input tokens before and after compaction', ('phase',))
+LLM_CALLS = registry.counter(
+    'research_llm_calls_total', 'LLM calls by agent role', ('role',))
+LLM_HEDGES = registry.counter(
+    'research_llm_hedges_total', 'LLM calls that were hedged to the secondary provider', ('role',))
+LLM_HEDGE_WINS = registry.counter(
+    'research_llm_hedge_wins_total', 'Provider that answered a hedged LLM call first', ('role', 'winner'))
+LLM_FAILOVERS = registry.counter(
+    'research_llm_failovers_total', 'LLM calls that failed over after a primary error', ('role',))
+RATE_LIMIT_THROTTLES = registry.counter(
+    'research_rate_limit_throttles_total', 'Provider calls rejected with a rate-limit response', ('provider',))
+RATE_LIMIT_WAIT = registry.histogram(
+    'research_rate_limit_wait_seconds', 'Time calls waited for a provider rate-limit token', ('provider',))
+HTTP_REQUESTS = registry.counter(
+    'http_requests_total', 'HTTP requests by method, path and status', ('method', 'path', 'status'))
+HTTP_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'path'))
+
+
+@contextmanager
+def span(name: str, stage: str = "") -> Iterator[None]:
+    """Time a block, recording it in the span histogram and the active trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_DURATION.observe(elapsed, span=name, stage=stage)
+        spans = _current_trace.get()
+        if spans is not None:
+            spans.append({'span': name, 'stage': stage, 'ms': round(elapsed * 1000, 3)})
+
+
+@contextmanager
+def trace() -> Iterator[List[Dict]]:
+    """Collect every span recorded in this context (and contexts copied from it)."""
+    spans: List[Dict] = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+
+def record_token_usage(stage: str, output) -> None:
+    """Count prompt and completion tokens from a crew output's usage metrics, if reported."""
+    usage = getattr(output, 'token_usage', None)
+    if usage is None:
+        return
+    if isinstance(usage, dict):
+        prompt, completion = usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+    else:
+        prompt, completion = getattr(usage, 'prompt_tokens', 0), getattr(usage, 'completion_tokens', 0)
+    LLM_TOKENS.inc(prompt or 0, stage=stage, direction='in')
+    LLM_TOKENS.inc(completion or 0, stage=stage, direction='out')
@@ -0,0 +1,191 @@
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from .metrics import span
+from .values import normalize_chart
+
+logger = logging.getLogger(__name__)
+
+# One alternation so charts and tables are found in a single scan of the output.
+# Bodies run to the first closing marker; the unrolled "[^[]*(?:\[(?!...)[^[]*)*"
+# form skips ahead to each "[" instead of retrying the marker at every character.
+_BLOCK_PATTERN = re.compile(
+    r'\[CHART_DATA type=(?P<chart_type>\w+) title="(?P<chart_title>[^"]+)"\]'
+    r'(?P<chart_body>[^\[]*(?:\[(?!/CHART_DATA\])[^\[]*)*)\[/CHART_DATA\]'
+    r'|\[TABLE_DATA title="(?P<table_title>[^"]+)"\]'
+    r'(?P<table_body>[^\[]*(?:\[(?!/TABLE_DATA\])[^\[]*)*)\[/TABLE_DATA\]'
+)
+_SEPARATOR_CHARS = frozenset('|-: \t')
+
+
+def parse_chart(chart_type: str, title: str, body: str) -> Optional[Dict]:
+    """Build a Chart.js-style chart from a CHART_DATA body, skipping malformed items.
+
+    Values are normalized to one unit for the chart (see values.normalize_values).
+    Datasets carry 'ranges' when any value was a range, 'projected' when any
+    was annotated as projected and 'mismatched' when any named a unit other
+    than the chart's, in which case its data point is None.
+    """
+    values = normalize_chart(body)
+    if values is None:
+        return None
+    labels = values['labels']
+    if not all(values['valid']):
+        for label, valid in zip(labels, values['valid']):
+            if not valid:
+                logger.debug(f"Skipping unparseable value in chart '{title}': {label}")
+        if not any(values['valid']):
+            return None
+        labels = [label for label, valid in zip(labels, values['valid']) if valid]
+
+    dataset = {'label': title, 'data': values['data']}
+    if values['ranges'].count(None) < len(values['ranges']):
+        dataset['ranges'] = values['ranges']
+    if any(values['projected']):
+        dataset['projected'] = values['projected']
+    if any(values['mismatched']):
+        dataset['mismatched'] = values['mismatched']
+    return {
+        'type': chart_type,
+        'title': title,
+        'unit': values['unit'],
+        'data': {
+            'labels': labels,
+            'datasets': [dataset]
+        }
+    }
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def parse_table(title: str, body: str) -> Optional[Dict]:
+    """Build a table from a markdown TABLE_DATA body, skipping rows of the wrong width."""
+    lines = [line for line in body.strip().splitlines() if line.strip()]
+    if len(lines) < 2:
+        return None
+
+    headers = _split_row(lines[0])
+    rows = []
+    for line in lines[1:]:
+        if _SEPARATOR_CHARS.issuperset(line):
+            continue
+        cells = line.strip().strip('|').split('|')
+        if len(cells) != len(headers):
+            logger.debug(f"Skipping malformed row in table '{title}': {line.strip()}")
+            continue
+        rows.append(dict(zip(headers, map(str.strip, cells))))
+
+    if not rows:
+        return None
+    return {
+        'title': title,
+        'headers': headers,
+        'rows': rows
+    }
+
+
+def _series_title(title: str, series: str) -> str:
+    """Chart title with the series name removed, so "Smart Watch Market Share" matches "Market Share"."""
+    cleaned = re.sub(re.escape(series), " ", title, flags=re.IGNORECASE) if series else title
+    cleaned = " ".join(cleaned.split()).strip(" -:")
+    return cleaned or title
+
+
+def merge_charts(charts_by_series: Dict[str, List[Dict]]) -> List[Dict]:
+    """Merge same-type, same-title charts from several series into multi-dataset charts.
+
+    Labels are aligned on one shared axis in first-seen order, matched
+    case-insensitively; a series with no value for a label gets None there.
+    Each dataset is labelled with its series name and rescaled to the unit
+    of the first chart merged, so "$1.2B" and "$900M" series share an axis.
+    Charts whose unit type or currency differ, such as percentages and USD
+    or USD and EUR, are never merged. Charts only one series produced are
+    kept with a single dataset.
+
+    Args:
+        charts_by_series (dict): Parsed charts keyed by series name (e.g. product)
+
+    Returns:
+        list: Charts in the Chart.js-style shape produced by parse_chart
+    """
+    merged: Dict[Tuple, Dict] = {}
+    for series, charts in charts_by_series.items():
+        for chart in charts:
+            title = _series_title(chart['title'], series)
+            unit = chart.get('unit') or {}
+            key = (chart['type'], title.casefold(), unit.get('type'), unit.get('currency'))
+            entry = merged.setdefault(key, {
+                'type': chart['type'], 'title': title, 'unit': chart.get('unit'),
+                'labels': [], 'positions': {}, 'datasets': []
+            })
+            factor = 1.0
+            if entry['unit'] and chart.get('unit'):
+                factor = chart['unit']['multiplier'] / entry['unit']['multiplier']
+            datasets = chart['data']['datasets']
+            for dataset in datasets:
+                points = {}
+                ranges = dataset.get('ranges') or [None] * len(dataset['data'])
+                projected = dataset.get('projected') or [False] * len(dataset['data'])
+                for label, value, value_range, is_projected in zip(chart['data']['labels'], dataset['data'],
+                                                                   ranges, projected):
+                    normalized = " ".join(label.split()).casefold()
+                    if normalized not in entry['positions']:
+                        entry['positions'][normalized] = len(entry['labels'])
+                        entry['labels'].append(label)
+                    if value is not None and factor != 1.0:
+                        value = round(value * factor, 6)
+                        value_range = value_range and [round(bound * factor, 6) for bound in value_range]
+                    points.setdefault(normalized, (value, value_range, is_projected))
+                name = series if len(datasets) == 1 else f"{series} - {dataset['label']}"
+                entry['datasets'].append((name, points))
+
+    results = []
+    for entry in merged.values():
+        datasets = []
+        for name, points in entry['datasets']:
+            aligned = [points.get(normalized, (None, None, False)) for normalized in entry['positions']]
+            dataset = {'label': name, 'data': [point[0] for point in aligned]}
+            if any(point[1] is not None for point in aligned):
+                dataset['ranges'] = [point[1] for point in aligned]
+            if any(point[2] for point in aligned):
+                dataset['projected'] = [point[2] for point in aligned]
+            datasets.append(dataset)
+        chart = {'type': entry['type'], 'title': entry['title']}
+        if entry['unit']:
+            chart['unit'] = entry['unit']
+        chart['data'] = {'labels': entry['labels'], 'datasets': datasets}
+        results.append(chart)
+    return results
+
+
+def parse_structured_output(text: str) -> Tuple[str, List[Dict], List[Dict]]:
+    """Split analyst output into markdown content, charts and tables in one pass.
+
+    Returns:
+        tuple: (content with marker blocks removed, charts, tables)
+    """
+    with span('parse'):
+        return _parse_structured_output(text)
+
+
+def _parse_structured_output(text: str) -> Tuple[str, List[Dict], List[Dict]]:
+    content = []
+    charts = []
+    tables = []
+    position = 0
+    for match in _BLOCK_PATTERN.finditer(text):
+        content.append(text[position:match.start()])
+        position = match.end()
+        chart_type, chart_title, chart_body, table_title, table_body = match.groups()
+        if chart_type:
+            chart = parse_chart(chart_type, chart_title, chart_body)
+            if chart:
+                charts.append(chart)
+        else:
+            table = parse_table(table_title, table_body)
+            if table:
+                tables.append(table)
+    content.append(text[position:])
+    return ''.join(content), charts, tables
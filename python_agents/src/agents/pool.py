@@ -0,0 +1,340 @@
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
+
+from .cache import Cache
+from .disk_cache import create_cache
+from .keys import KeyIndex, analysis_key, normalize_product
+from .exceptions import AgentError, ValidationError
+from .metrics import CACHE_LOOKUPS, CACHE_REFRESHES
+from .refresh import RefreshScheduler
+from .report_store import ReportStore, create_report_store
+from .single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from .research_manager import ResearchManager
+
+logger = logging.getLogger(__name__)
+
+
+def stale_report(report: Dict, expired_for: float) -> Dict:
+    """Copy of an expired cached report flagged as stale, with its age in the metadata."""
+    metadata = dict(report.get('metadata') or {})
+    try:
+        age = (datetime.now() - datetime.fromisoformat(metadata['timestamp'])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        age = None
+    metadata['stale'] = True
+    metadata['age_seconds'] = round(age) if age is not None else None
+    metadata['expired_seconds'] = round(expired_for)
+    return {**report, 'metadata': metadata}
+
+
+class ManagerPool:
+    """Fixed-size pool of pre-built ResearchManager instances.
+
+    Managers are constructed and warmed once, then checked out for the duration
+    of a single analysis and returned afterwards. All managers share one cache,
+    which is persisted to disk when CACHE_DB_PATH is set, and one searchable
+    report history, stored at REPORT_DB_PATH (data/reports.sqlite3 by default).
+
+    When the cache keeps expired reports for a grace window
+    (CACHE_STALE_GRACE_HOURS), requests inside the window get the stale
+    report immediately while one background run recomputes it.
+    """
+
+    def __init__(self, size: Optional[int] = None, cache: Optional[Cache] = None,
+                 checkout_timeout: Optional[float] = None, report_store: Optional[ReportStore] = None):
+        if size is None:
+            size = int(os.getenv("RESEARCH_POOL_SIZE", 2))
+        if checkout_timeout is None:
+            checkout_timeout = float(os.getenv("RESEARCH_POOL_TIMEOUT", 300))
+        self.size = max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.cache = cache if cache is not None else create_cache()
+        self.key_index = KeyIndex()
+        self.reports = report_store if report_store is not None else create_report_store()
+        self._available: "queue.Queue[ResearchManager]" = queue.Queue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error: Optional[str] = None
+        self.single_flight = SingleFlight()
+        self.refresher = RefreshScheduler(self.cache, self.refresh)
+        self._revalidating: set = set()
+        self._revalidating_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether every manager in the pool has been built and warmed."""
+        return self._ready.is_set()
+
+    def warm(self) -> None:
+        """Construct and warm all managers. Safe to call more than once."""
+        with self._lock:
+            if self._ready.is_set():
+                return
+            try:
+                # Deferred so importing the pool does not load crewai
+                from .research_manager import ResearchManager
+                while self._available.qsize() < self.size:
+                    manager = ResearchManager(cache=self.cache, key_index=self.key_index,
+                                              report_store=self.reports)
+                    manager.warm()
+                    self._available.put_nowait(manager)
+                self._error = None
+                self._ready.set()
+                logger.info(f"Research manager pool ready with {self.size} managers")
+            except Exception as e:
+                self._error = str(e)
+                logger.error(f"Error warming research manager pool: {str(e)}")
+                raise
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator["ResearchManager"]:
+        """Borrow a manager for one analysis and return it to the pool afterwards."""
+        if not self.ready:
+            self.warm()
+        try:
+            manager = self._available.get(timeout=timeout if timeout is not None else self.checkout_timeout)
+        except queue.Empty:
+            raise AgentError("No research manager available, try again later")
+        try:
+            yield manager
+        finally:
+            self._available.put_nowait(manager)
+
+    def _analyze(self, product_name: str, context: str) -> Union[Dict, str]:
+        with self.checkout() as manager:
+            return manager.analyze_task(product_name, context)
+
+    def analyze(self, product_name: str, context: str = "") -> Union[Dict, str]:
+        """Run an analysis on a pooled manager.
+
+        Identical requests arriving while one is in flight wait for and share
+        its result instead of starting their own crew runs. An expired report
+        still inside the stale grace window is returned at once, marked stale,
+        and recomputed in the background.
+        """
+        self.refresher.record_access(product_name, context)
+        key = analysis_key(product_name, context)
+        stale = self.get_stale(product_name, context)
+        if stale is not None:
+            return stale
+        result, _ = self.single_flight.do(key, self._analyze, product_name, context)
+        return result
+
+    def _refresh(self, product_name: str, context: str) -> Dict:
+        with self.checkout() as manager:
+            # Stages cached for longer than the refresh window (e.g. industry) are reused
+            result = manager.analyze_task(product_name, context, refresh=True,
+                                          min_stage_ttl=self.refresher.window)
+        if not isinstance(result, dict):
+            raise AgentError(str(result))
+        if result['metadata'].get('status') != 'success':
+            raise AgentError(f"Refresh incomplete, keeping the cached report: {result.get('errors')}")
+        return result
+
+    def refresh(self, product_name: str, context: str = "") -> Dict:
+        """Recompute an analysis, replacing its cached report on success.
+
+        Only stages whose cached output expires within the refresh window
+        (REFRESH_WINDOW_HOURS) run again; the rest are reused.
+        """
+        result, _ = self.single_flight.do(f"refresh:{analysis_key(product_name, context)}",
+                                          self._refresh, product_name, context)
+        return result
+
+    def _revalidate(self, key: str, product_name: str, context: str) -> None:
+        try:
+            self.refresh(product_name, context)
+            CACHE_REFRESHES.inc(trigger='stale', result='success')
+            logger.info(f"Revalidated stale cached analysis for '{key}'")
+        except Exception as e:
+            CACHE_REFRESHES.inc(trigger='stale', result='error')
+            logger.error(f"Error revalidating stale cached analysis for '{key}': {str(e)}")
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(key)
+
+    def revalidate(self, product_name: str, context: str = "") -> bool:
+        """Recompute a report on a background thread unless that is already happening.
+
+        Returns:
+            bool: Whether a new recomputation was started
+        """
+        key = analysis_key(product_name, context)
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+        threading.Thread(target=self._revalidate, args=(key, product_name, context),
+                         name="revalidate", daemon=True).start()
+        return True
+
+    def get_stale(self, product_name: str, context: str = "") -> Optional[Dict]:
+        """Expired report still inside the grace window, marked stale; starts its revalidation."""
+        stale = self.cache.get_stale(analysis_key(product_name, context))
+        if stale is None:
+            return None
+        CACHE_LOOKUPS.inc(cache='result', result='stale')
+        self.revalidate(product_name, context)
+        return stale_report(*stale)
+
+    def get_cached(self, product_name: str, context: str = "") -> Optional[Dict]:
+        """Previously computed report for a request, without running an analysis.
+
+        Falls back to a stale report inside the grace window.
+        """
+        cached = self.cache.get(analysis_key(product_name, context))
+        return cached if cached is not None else self.get_stale(product_name, context)
+
+    def analyze_stream(self, product_name: str, context: str = "") -> Iterator[Dict]:
+        """Stream per-stage events from a pooled manager, holding it until the stream ends."""
+        self.refresher.record_access(product_name, context)
+        with self.checkout() as manager:
+            yield from manager.analyze_stream(product_name, context)
+
+    def _timed_analyze(self, product_name: str, context: str):
+        start = time.perf_counter()
+        try:
+            result, error = self.analyze(product_name, context), None
+        except Exception as e:
+            logger.error(f"Batch item '{product_name}' failed: {str(e)}")
+            result, error = None, str(e)
+        return result, error, time.perf_counter() - start
+
+    def analyze_batch(self, items: List[Dict], max_parallel: Optional[int] = None) -> Iterator[Dict]:
+        """Analyze many products in parallel, yielding an event per item as it completes.
+
+        Items with the same normalized cache key run once and are reported
+        together. Runs share the pool's cache, cached stages and the search
+        cache. The final event summarizes wall time against the serial
+        baseline (the sum of every run's duration).
+
+        Args:
+            items (list): Dicts with 'product_name' and optional 'context'
+            max_parallel (int): Runs in flight at once (BATCH_MAX_PARALLEL, default the pool size)
+        """
+        if max_parallel is None:
+            max_parallel = int(os.getenv("BATCH_MAX_PARALLEL", self.size))
+
+        positions: Dict[str, List[int]] = {}
+        unique = []
+        for index, item in enumerate(items):
+            key = analysis_key(item['product_name'], item.get('context', ""))
+            if key not in positions:
+                positions[key] = []
+                unique.append((key, item))
+            positions[key].append(index)
+
+        start = time.perf_counter()
+        serial = 0.0
+        succeeded = failed = 0
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(unique))),
+                                      thread_name_prefix="batch")
+        try:
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._timed_analyze,
+                                item['product_name'], item.get('context', "")): (key, item)
+                for key, item in unique
+            }
+            for future in as_completed(futures):
+                key, item = futures[future]
+                result, error, elapsed = future.result()
+                serial += elapsed
+                if error is None and isinstance(result, str):
+                    error = result
+                if error is None:
+                    status = result.get('metadata', {}).get('status', 'success')
+                    succeeded += 1
+                else:
+                    status = 'error'
+                    failed += 1
+                yield {
+                    'stage': 'item',
+                    'indexes': positions[key],
+                    'product_name': item['product_name'],
+                    'context': item.get('context', ""),
+                    'status': status,
+                    'duration_ms': round(1000 * elapsed, 1),
+                    'error': error,
+                    'response': result if error is None else None
+                }
+        finally:
+            # A client that disconnects mid-batch should not leave queued runs behind
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        wall = time.perf_counter() - start
+        yield {
+            'stage': 'summary',
+            'items': len(items),
+            'unique_items': len(unique),
+            'duplicates': len(items) - len(unique),
+            'succeeded': succeeded,
+            'failed': failed,
+            'wall_ms': round(1000 * wall, 1),
+            'serial_ms': round(1000 * serial, 1),
+            'speedup': round(serial / wall, 2) if wall > 0 else None
+        }
+
+    def _run_analysts(self, product_name: str, context: str):
+        with self.checkout() as manager:
+            return manager.run_analysts(product_name, context)
+
+    def _compare(self, products: List[str], context: str, max_parallel: int) -> Dict:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(products))),
+                                      thread_name_prefix="compare")
+        try:
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._run_analysts, product, context): product
+                for product in products
+            }
+            analyses = {futures[future]: future.result() for future in as_completed(futures)}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self.checkout() as manager:
+            return manager.compare_task(products, context, analyses)
+
+    def compare(self, products: List[str], context: str = "", max_parallel: Optional[int] = None) -> Dict:
+        """Compare products with one comparative synthesis over their analyst results.
+
+        Each product's analysts run (or reuse their cached stage outputs) on
+        pooled managers in parallel. Products that normalize to the same name
+        are compared once, and identical comparisons in flight are shared.
+
+        Args:
+            products (list): Product names to compare
+            context (str): Context shared by every product
+            max_parallel (int): Products analyzed at once (BATCH_MAX_PARALLEL, default the pool size)
+
+        Raises:
+            ValidationError: If fewer than two distinct products are given
+        """
+        if max_parallel is None:
+            max_parallel = int(os.getenv("BATCH_MAX_PARALLEL", self.size))
+        unique: Dict[str, str] = {}
+        for product in products:
+            unique.setdefault(normalize_product(product), product)
+        if len(unique) < 2:
+            raise ValidationError("Comparison needs at least two distinct products")
+        key = "compare:" + "|".join(analysis_key(product, context) for product in sorted(unique))
+        result, _ = self.single_flight.do(key, self._compare, list(unique.values()), context, max_parallel)
+        return result
+
+    def get_stats(self) -> Dict:
+        """Get pool statistics."""
+        return {
+            'ready': self.ready,
+            'size': self.size,
+            'available': self._available.qsize(),
+            'error': self._error,
+            'revalidating': len(self._revalidating),
+            'single_flight': self.single_flight.get_stats()
+        }
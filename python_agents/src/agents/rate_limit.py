@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import RATE_LIMIT_THROTTLES, RATE_LIMIT_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """In-process token bucket refilled at ``rate`` tokens per second up to ``burst``.
+
+    ``reserve`` always takes a token, letting the balance go negative, and
+    returns how long the caller must wait before using it. Callers are
+    therefore served in arrival order without polling.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; return the seconds to wait before it may be used."""
+        with self._lock:
+            now = self._clock()
+            if self.rate <= 0:
+                return max(0.0, self._paused_until - now)
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every reservation until at least ``seconds`` from now."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class FileTokenBucket:
+    """Token bucket whose state lives in a locked file, shared by worker processes on one host.
+
+    Uses wall-clock time and POSIX file locks; one small JSON file per provider.
+    """
+
+    def __init__(self, path: str, rate: float, burst: Optional[float] = None):
+        import fcntl
+        self._fcntl = fcntl
+        self.path = path
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Threads in this process also contend for the file lock, which is per process
+        self._lock = threading.Lock()
+
+    def _update(self, fn: Callable[[Dict, float], float]) -> float:
+        with self._lock, open(self.path, 'a+') as f:
+            self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except json.JSONDecodeError:
+                    state = {}
+                now = time.time()
+                state.setdefault('tokens', self.burst)
+                state.setdefault('updated', now)
+                state.setdefault('paused_until', 0.0)
+                result = fn(state, now)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return result
+            finally:
+                self._fcntl.flock(f, self._fcntl.LOCK_UN)
+
+    def reserve(self) -> float:
+        """Take a token; return the seconds to wait before it may be used."""
+        def take(state: Dict, now: float) -> float:
+            if self.rate <= 0:
+                return max(0.0, state['paused_until'] - now)
+            tokens = min(self.burst, state['tokens'] + (now - state['updated']) * self.rate) - 1
+            state['tokens'], state['updated'] = tokens, now
+            wait = -tokens / self.rate if tokens < 0 else 0.0
+            return max(wait, state['paused_until'] - now)
+        return self._update(take)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every reservation, in every process, until at least ``seconds`` from now."""
+        def hold(state: Dict, now: float) -> float:
+            state['paused_until'] = max(state['paused_until'], now + seconds)
+            return 0.0
+        self._update(hold)
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether an exception is a provider rate-limit (HTTP 429) response."""
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    if status == 429:
+        return True
+    if 'ratelimit' in type(error).__name__.casefold():
+        return True
+    message = str(error).casefold()
+    return 'rate limit' in message or 'resource_exhausted' in message or 'resource exhausted' in message
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header on the error's response, if present."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """Per-provider limiter combining a token bucket with AIMD concurrency control.
+
+    Concurrency grows by roughly one slot per window of successful calls and
+    halves on every throttled response. A throttle also pauses the bucket, so
+    all callers (and, with the file backend, all workers) back off together
+    and retry once instead of each retrying on its own schedule.
+    """
+
+    def __init__(self, name: str, rate: float = 0, burst: Optional[float] = None,
+                 max_concurrency: int = 8, min_concurrency: int = 1, max_retries: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 30.0, backend_dir: Optional[str] = None):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(max(self.min_concurrency, self.max_concurrency // 2))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        if backend_dir:
+            self.bucket = FileTokenBucket(os.path.join(backend_dir, f"{name}.bucket"), rate, burst)
+        else:
+            self.bucket = TokenBucket(rate, burst)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._calls = 0
+        self._throttled = 0
+
+    def _enter(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+        wait = self.bucket.reserve()
+        if wait > 0:
+            RATE_LIMIT_WAIT.observe(wait, provider=self.name)
+            time.sleep(wait)
+
+    def _exit(self, throttled: bool = False, succeeded: bool = True) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._calls += 1
+            if throttled:
+                self._throttled += 1
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+            elif succeeded:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn under the limiter, retrying throttled calls after a shared back-off."""
+        attempt = 0
+        while True:
+            self._enter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_throttled(e):
+                    self._exit(succeeded=False)
+                    raise
+                self._exit(throttled=True)
+                RATE_LIMIT_THROTTLES.inc(provider=self.name)
+                delay = retry_after(e) or min(self.max_backoff, self.backoff * 2 ** attempt)
+                self.bucket.pause(delay)
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.error(f"{self.name} rate limited, retrying in {delay:.1f}s "
+                             f"(concurrency limit {int(self.limit)})")
+                continue
+            self._exit()
+            return result
+
+    def get_stats(self) -> Dict:
+        """Current concurrency limit, calls in flight and throttle rate."""
+        with self._cond:
+            return {
+                'concurrency_limit': int(self.limit),
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+                'calls': self._calls,
+                'throttled': self._throttled,
+                'throttle_rate': self._throttled / self._calls if self._calls else 0.0
+            }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def provider_for_model(model: str) -> str:
+    """Provider prefix of a model name ("gemini/gemini-2.0-flash-exp" -> "gemini")."""
+    return model.split('/', 1)[0] if '/' in model else model
+
+
+def get_limiter(provider: str) -> AdaptiveLimiter:
+    """Process-wide limiter for a provider, configured from RATE_LIMIT_<PROVIDER>_* env vars.
+
+    RATE_LIMIT_DIR, when set, shares each provider's token bucket across
+    worker processes through a file in that directory.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            prefix = f"RATE_LIMIT_{provider.upper()}"
+            burst = os.getenv(f"{prefix}_BURST")
+            limiter = _limiters[provider] = AdaptiveLimiter(
+                provider,
+                rate=float(os.getenv(f"{prefix}_RPS", 0)),
+                burst=float(burst) if burst else None,
+                max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", 8)),
+                backend_dir=os.getenv("RATE_LIMIT_DIR") or None
+            )
+        return limiter
+
+
+def get_stats() -> Dict[str, Dict]:
+    """Stats for every limiter created so far."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.get_stats() for name, limiter in limiters.items()}
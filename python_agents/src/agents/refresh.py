@@ -0,0 +1,159 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .keys import analysis_key
+from .metrics import CACHE_REFRESHES
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Re-run the most requested analyses shortly before their cached reports expire.
+
+    Access frequency is tracked per normalized request key as an exponentially
+    decaying count. Every ``interval_seconds`` the ``top_n`` hottest keys whose
+    report expires within ``window_hours`` are recomputed in the background,
+    at most ``max_concurrency`` at a time and ``budget_per_hour`` per hour.
+    The refresh overwrites the cached report in a single cache write, so
+    readers see either the old or the new report, never a miss.
+    """
+
+    def __init__(self, cache: Any, refresh: Callable[[str, str], Any], top_n: Optional[int] = None,
+                 window_hours: Optional[float] = None, max_concurrency: Optional[int] = None,
+                 budget_per_hour: Optional[int] = None, interval_seconds: Optional[float] = None,
+                 half_life_hours: Optional[float] = None, max_tracked: int = 5000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.cache = cache
+        self.refresh = refresh
+        self.top_n = top_n if top_n is not None else int(os.getenv("REFRESH_TOP_N", 10))
+        self.window = 3600 * (window_hours if window_hours is not None
+                              else float(os.getenv("REFRESH_WINDOW_HOURS", 2)))
+        self.max_concurrency = max(1, max_concurrency if max_concurrency is not None
+                                   else int(os.getenv("REFRESH_MAX_CONCURRENCY", 1)))
+        self.budget_per_hour = budget_per_hour if budget_per_hour is not None \
+            else int(os.getenv("REFRESH_BUDGET_PER_HOUR", 20))
+        self.interval = interval_seconds if interval_seconds is not None \
+            else float(os.getenv("REFRESH_INTERVAL_SECONDS", 300))
+        self.half_life = 3600 * (half_life_hours if half_life_hours is not None
+                                 else float(os.getenv("REFRESH_HALF_LIFE_HOURS", 24)))
+        self.max_tracked = max_tracked
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> [decayed access count, time of last update, product_name, context]
+        self._access: Dict[str, List] = {}
+        self._in_flight: set = set()
+        self._started: Deque[float] = deque()
+        self._refreshed = 0
+        self._failed = 0
+        self._over_budget = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="refresh")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def record_access(self, product_name: str, context: str = "") -> None:
+        """Count one request for an analysis."""
+        key = analysis_key(product_name, context)
+        with self._lock:
+            now = self._clock()
+            entry = self._access.get(key)
+            if entry is None:
+                self._access[key] = [1.0, now, product_name, context]
+                if len(self._access) > self.max_tracked:
+                    coldest = min(self._access, key=lambda k: self._decayed(*self._access[k][:2], now))
+                    del self._access[coldest]
+            else:
+                entry[0] = self._decayed(entry[0], entry[1], now) + 1
+                entry[1] = now
+
+    def hottest(self, n: Optional[int] = None) -> List[Tuple[str, float, str, str]]:
+        """The n most frequently requested analyses as (key, score, product_name, context)."""
+        with self._lock:
+            now = self._clock()
+            ranked = sorted(
+                ((key, self._decayed(score, updated, now), product_name, context)
+                 for key, (score, updated, product_name, context) in self._access.items()),
+                key=lambda item: item[1], reverse=True
+            )
+        return ranked[:n if n is not None else self.top_n]
+
+    def _run(self, key: str, product_name: str, context: str) -> None:
+        try:
+            self.refresh(product_name, context)
+            with self._lock:
+                self._refreshed += 1
+            CACHE_REFRESHES.inc(trigger='ahead', result='success')
+            logger.info(f"Refreshed cached analysis for '{key}'")
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+            CACHE_REFRESHES.inc(trigger='ahead', result='error')
+            logger.error(f"Error refreshing cached analysis for '{key}': {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def tick(self) -> List[str]:
+        """Start refreshes for hot keys that are close to expiry. Returns the keys started."""
+        started = []
+        for key, _, product_name, context in self.hottest():
+            remaining = self.cache.ttl_remaining(key)
+            # Absent entries were never cached or already expired; only refresh ahead of expiry
+            if remaining is None or remaining > self.window:
+                continue
+            with self._lock:
+                now = self._clock()
+                while self._started and now - self._started[0] >= 3600:
+                    self._started.popleft()
+                if len(self._in_flight) >= self.max_concurrency:
+                    break
+                if key in self._in_flight:
+                    continue
+                if len(self._started) >= self.budget_per_hour:
+                    self._over_budget += 1
+                    break
+                self._in_flight.add(key)
+                self._started.append(now)
+            self._executor.submit(self._run, key, product_name, context)
+            started.append(key)
+        return started
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Refresh scheduler tick failed: {str(e)}")
+
+    def start(self) -> None:
+        """Run tick() every interval_seconds on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling; refreshes already running are left to finish."""
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        """Tracked keys, hottest keys and refresh counters."""
+        hottest = self.hottest()
+        with self._lock:
+            return {
+                'running': self._thread is not None and not self._stop.is_set(),
+                'tracked_keys': len(self._access),
+                'hottest': [{'key': key, 'score': round(score, 2)} for key, score, _, _ in hottest],
+                'in_flight': len(self._in_flight),
+                'refreshed': self._refreshed,
+                'failed': self._failed,
+                'started_last_hour': len(self._started),
+                'skipped_over_budget': self._over_budget
+            }
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from .exceptions import StoreError
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('manager', 'market', 'consumer', 'industry')
+
+# bm25 column weights: product name, context, then each section
+RANK_WEIGHTS = (10.0, 4.0, 2.0, 1.0, 1.0, 1.0)
+
+
+def section_text(section: Any) -> str:
+    """Searchable text of a report section, which is a string or a structured output dict."""
+    if section is None:
+        return ""
+    if isinstance(section, dict):
+        return str(section.get('content', ""))
+    return str(section)
+
+
+def match_query(query: str) -> str:
+    """FTS5 query matching every word of free text, so user input cannot break the syntax."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+class ReportStore:
+    """Searchable history of analysis reports in SQLite with an FTS5 index.
+
+    Every report is kept with its product, context and creation time; the
+    product, context and per-section text are indexed for ranked full-text
+    search. Only the newest max_per_key reports of each cache key are kept,
+    so refreshing a report does not grow the history without bound (0 keeps
+    all). One connection, opened on first use, is shared by the process
+    behind a lock. With a file path the history survives restarts and can be
+    read by several workers; a ``:memory:`` store lasts for the process.
+    """
+
+    def __init__(self, path: str = ":memory:", max_per_key: int = 5):
+        self.path = path
+        self.max_per_key = max_per_key
+        self._lock = threading.Lock()
+        # Opened on first use, so building a store touches no files
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """This store's connection, creating the database on first use. Call with the lock held."""
+        if self._conn is not None:
+            return self._conn
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS reports (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        key TEXT NOT NULL,
+                        product_name TEXT NOT NULL,
+                        context TEXT NOT NULL,
+                        created_at TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        response TEXT NOT NULL
+                    )"""
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_key ON reports (key)")
+                conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5("
+                    f"product_name, context, {', '.join(SECTIONS)}, tokenize='porter unicode61')"
+                )
+        except sqlite3.Error as e:
+            raise StoreError(f"Error opening report store: {str(e)}")
+        self._conn = conn
+        return conn
+
+    def add(self, key: str, product_name: str, context: str, response: Dict) -> int:
+        """Persist a report and index its text, dropping the key's reports beyond max_per_key.
+
+        Returns the report id.
+        """
+        metadata = response.get('metadata') or {}
+        results = response.get('results') or {}
+        try:
+            payload = json.dumps(response, default=str)
+            with self._lock, self._connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO reports (key, product_name, context, created_at, status, response) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, product_name, context or "", metadata.get('timestamp') or datetime.now().isoformat(),
+                     metadata.get('status', 'success'), payload)
+                )
+                report_id = cursor.lastrowid
+                conn.execute(
+                    f"INSERT INTO reports_fts (rowid, product_name, context, {', '.join(SECTIONS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' for _ in SECTIONS)})",
+                    (report_id, product_name, context or "", *(section_text(results.get(name)) for name in SECTIONS))
+                )
+                if self.max_per_key > 0:
+                    expired = conn.execute(
+                        "SELECT id FROM reports WHERE key = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+                        (key, self.max_per_key)
+                    ).fetchall()
+                    conn.executemany("DELETE FROM reports WHERE id = ?", expired)
+                    conn.executemany("DELETE FROM reports_fts WHERE rowid = ?", expired)
+            return report_id
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            raise StoreError(f"Error saving report: {str(e)}")
+
+    def get(self, report_id: int) -> Optional[Dict]:
+        """A stored report by id, or None."""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT id, product_name, context, created_at, status, response FROM reports WHERE id = ?",
+                    (report_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            raise StoreError(f"Error reading report: {str(e)}")
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'product_name': row[1],
+            'context': row[2],
+            'created_at': row[3],
+            'status': row[4],
+            'report': json.loads(row[5])
+        }
+
+    def search(self, query: str = "", limit: int = 20, offset: int = 0) -> Dict:
+        """Reports matching every word of the query, best match first.
+
+        An empty query lists the most recent reports.
+
+        Args:
+            query (str): Free text matched against product, context and section text
+            limit (int): Page size
+            offset (int): Matches to skip
+
+        Returns:
+            dict: 'total' matches and this page of 'results' with a text snippet each
+        """
+        match = match_query(query)
+        try:
+            with self._lock:
+                conn = self._connection()
+                if match:
+                    total = conn.execute(
+                        "SELECT COUNT(*) FROM reports_fts WHERE reports_fts MATCH ?", (match,)
+                    ).fetchone()[0]
+                    rows = conn.execute(
+                        f"""SELECT r.id, r.product_name, r.context, r.created_at, r.status,
+                                   bm25(reports_fts, {', '.join(map(str, RANK_WEIGHTS))}) AS rank,
+                                   snippet(reports_fts, -1, '[', ']', '...', 16)
+                            FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid
+                            WHERE reports_fts MATCH ?
+                            ORDER BY rank LIMIT ? OFFSET ?""",
+                        (match, limit, offset)
+                    ).fetchall()
+                else:
+                    total = conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+                    rows = conn.execute(
+                        "SELECT id, product_name, context, created_at, status, NULL, NULL "
+                        "FROM reports ORDER BY id DESC LIMIT ? OFFSET ?",
+                        (limit, offset)
+                    ).fetchall()
+        except sqlite3.Error as e:
+            raise StoreError(f"Error searching reports: {str(e)}")
+
+        results: List[Dict] = [{
+            'id': row[0],
+            'product_name': row[1],
+            'context': row[2],
+            'created_at': row[3],
+            'status': row[4],
+            # bm25 is lower for better matches; flip it so higher scores rank first
+            'score': -row[5] if row[5] is not None else None,
+            'snippet': row[6]
+        } for row in rows]
+        return {
+            'query': query,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + len(results) if offset + len(results) < total else None,
+            'results': results
+        }
+
+    def get_stats(self) -> Dict:
+        """Number of stored reports and the per-key limit."""
+        try:
+            with self._lock:
+                reports = self._connection().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        except sqlite3.Error as e:
+            raise StoreError(f"Error getting report store stats: {str(e)}")
+        return {'path': self.path, 'reports': reports, 'max_per_key': self.max_per_key}
+
+
+def create_report_store() -> ReportStore:
+    """Build the report history at REPORT_DB_PATH (":memory:" keeps it for the process only)."""
+    return ReportStore(os.getenv("REPORT_DB_PATH", "data/reports.sqlite3"),
+                       max_per_key=int(os.getenv("REPORT_HISTORY_PER_KEY", 5)))
@@ -1,23 +1,63 @@
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import contextvars
+import hashlib
 import logging
+import os
 
 from crewai import Crew, Task
 from .base_agent import BaseAgent
 from .market_analyst import MarketAnalyst
 from .consumer_analyst import ConsumerAnalyst
 from .industry_analyst import IndustryAnalyst
-from .exceptions import AgentError, LLMError
+from .exceptions import AgentError, LLMError, StoreError
 from .cache import Cache
+from .keys import KeyIndex, analysis_key, normalize_product, normalize_text
+from .report_store import ReportStore
+from .parsing import merge_charts, parse_structured_output
+from .compaction import compact_for_synthesis, estimate_tokens
+from .metrics import ANALYST_ERRORS, CACHE_LOOKUPS, SYNTHESIS_TOKENS, record_token_usage, span
 from textwrap import dedent
-from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Stage name -> (analyst attribute, task description, expected output)
+ANALYST_STAGES = {
+    'market': (
+        'market_analyst',
+        "Analyze market opportunities for {product_name}.\n\nContext: {context}",
+        "Market analysis with size, trends, and competition insights."
+    ),
+    'consumer': (
+        'consumer_analyst',
+        "Analyze consumer behavior for {product_name}.\n\nContext: {context}",
+        "Consumer analysis with demographics and behavior patterns."
+    ),
+    'industry': (
+        'industry_analyst',
+        # No context: the industry landscape is shared by every request for a product
+        "Analyze industry landscape for {product_name}.",
+        "Industry analysis with regulatory and technological insights."
+    ),
+}
+
+# Stage name -> inputs its output depends on and how long it stays valid. Upstream
+# stage names as inputs mean the stage re-runs whenever their output changes.
+# The inputs must cover every placeholder in the stage's task description.
+STAGE_CACHE_POLICY = {
+    'market': {'inputs': ('product_name', 'context'), 'ttl_hours': 24},
+    'consumer': {'inputs': ('product_name', 'context'), 'ttl_hours': 24},
+    'industry': {'inputs': ('product_name',), 'ttl_hours': 72},
+    'manager': {'inputs': ('product_name', 'context', *ANALYST_STAGES), 'ttl_hours': 24},
+}
+
 class ResearchManager(BaseAgent):
     """Research manager agent responsible for coordinating and synthesizing research."""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, cache: Optional[Cache] = None,
+                 synthesis_token_budget: Optional[int] = None, key_index: Optional[KeyIndex] = None,
+                 report_store: Optional[ReportStore] = None):
         super().__init__(
             role="Research Manager",
             goal="Coordinate and synthesize research findings into actionable insights",
@@ -25,108 +65,484 @@ class ResearchManager(BaseAgent):
             insights into cohesive recommendations. You excel at identifying key patterns and 
             opportunities across market, consumer, and industry analyses."""
         )
-        self.cache = Cache()
+        # Pooled managers share one cache so hits carry across requests
+        self.cache = cache if cache is not None else Cache()
+        self.key_index = key_index if key_index is not None else KeyIndex()
+        # Searchable history of every report; None keeps no history
+        self.report_store = report_store
         self.market_analyst = MarketAnalyst()
         self.consumer_analyst = ConsumerAnalyst()
         self.industry_analyst = IndustryAnalyst()
+        # Number of analyst crews allowed to run at once; 1 restores sequential runs
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("RESEARCH_MAX_CONCURRENCY", len(ANALYST_STAGES)))
+        self.max_concurrency = max(1, max_concurrency)
+        # Token budget for the analyst outputs pasted into synthesis; 0 disables compaction
+        if synthesis_token_budget is None:
+            synthesis_token_budget = int(os.getenv("SYNTHESIS_TOKEN_BUDGET", 3000))
+        self.synthesis_token_budget = synthesis_token_budget
+
+    @staticmethod
+    def cache_key(product_name: str, context: str = "") -> str:
+        """Key identifying an analysis request in the cache.
+
+        Product and context are normalized so that, for example, "Smart Watch"
+        and "smartwatches " share an entry.
+        """
+        return analysis_key(product_name, context)
 
-    @lru_cache(maxsize=100)
     def get_cached_analysis(self, product_name: str, context: str = "") -> Optional[Dict]:
-        """Get cached analysis results if available."""
-        return self.cache.get(f"{product_name}:{context}")
+        """Get cached analysis results if available.
+
+        Falls back to the most similar stored request when near-duplicate
+        matching is enabled.
+        """
+        key = self.cache_key(product_name, context)
+        with span('cache_lookup', stage='result'):
+            cached = self.cache.get(key)
+            result = 'exact' if cached else 'miss'
+            if not cached:
+                similar = self.key_index.find_similar(key)
+                if similar is not None:
+                    cached = self.cache.get(similar)
+                    if cached:
+                        logger.info(f"Serving near-duplicate cached report '{similar}' for '{key}'")
+                        result = 'near_duplicate'
+        self.key_index.record_lookup(key, f"{product_name}:{context}", result)
+        CACHE_LOOKUPS.inc(cache='result', result='hit' if cached else 'miss')
+        return cached
+
+    @staticmethod
+    def stage_cache_key(stage: str, **inputs: str) -> str:
+        """Key for a stage output, built only from the inputs the stage declares."""
+        parts = []
+        for name in STAGE_CACHE_POLICY[stage]['inputs']:
+            value = inputs.get(name, "")
+            if name == 'product_name':
+                value = normalize_product(value)
+            elif name == 'context':
+                value = normalize_text(value)
+            else:
+                # Upstream outputs are long; key on their digest
+                value = hashlib.sha1(value.encode()).hexdigest()
+            parts.append(value)
+        return f"stage:{stage}:" + ":".join(parts)
+
+    def get_cached_stage(self, stage: str, min_ttl: float = 0, **inputs: str) -> Optional[str]:
+        """Get a cached stage output if its inputs are unchanged.
+
+        With min_ttl, an output expiring within that many seconds counts as a miss.
+        """
+        key = self.stage_cache_key(stage, **inputs)
+        with span('cache_lookup', stage=stage):
+            cached = self.cache.get(key)
+            if cached and min_ttl > 0:
+                remaining = self.cache.ttl_remaining(key)
+                if remaining is None or remaining <= min_ttl:
+                    cached = None
+        CACHE_LOOKUPS.inc(cache=f'stage_{stage}', result='hit' if cached else 'miss')
+        return cached['output'] if cached else None
+
+    def cache_stage(self, stage: str, output: str, **inputs: str) -> None:
+        """Cache a stage output under its dependency key with the stage's TTL."""
+        self.cache.set(self.stage_cache_key(stage, **inputs), {'output': output},
+                       ttl_hours=STAGE_CACHE_POLICY[stage]['ttl_hours'])
+
+    def warm(self) -> None:
+        """Build the manager and analyst agents ahead of the first request."""
+        self.create_agent()
+        for analyst_attr, _, _ in ANALYST_STAGES.values():
+            getattr(self, analyst_attr).create_agent()
+
+    def run_stage(self, stage: str, product_name: str, context: str = "") -> str:
+        """Run a single analyst crew and return its raw output."""
+        analyst_attr, description, expected_output = ANALYST_STAGES[stage]
+        analyst = getattr(self, analyst_attr)
+        agent = analyst.create_agent()
+        # The analyst's marker instructions are what give the stage its charts and tables
+        task = Task(
+            description=description.format(product_name=product_name, context=context)
+            + "\n\n" + dedent(analyst.output_format).strip(),
+            agent=agent,
+            expected_output=expected_output
+        )
+        crew = Crew(agents=[agent], tasks=[task], verbose=True)
+        with span('kickoff', stage=stage):
+            output = crew.kickoff()
+        record_token_usage(stage, output)
+        return str(output)
+
+    def iter_analysts(self, product_name: str, context: str = "", reuse: bool = True,
+                      min_ttl: float = 0) -> Iterator[Tuple[str, str, Optional[str], bool]]:
+        """Run the market, consumer and industry crews concurrently.
+
+        Stages whose cached output is still valid for their declared inputs
+        are yielded first without running a crew, unless reuse is False or
+        the output expires within min_ttl seconds.
+
+        Yields:
+            tuple: (stage, raw output, error message, whether the output was reused)
+        """
+        pending = []
+        for stage in ANALYST_STAGES:
+            cached = self.get_cached_stage(stage, min_ttl, product_name=product_name, context=context) \
+                if reuse else None
+            if cached is not None:
+                yield stage, cached, None, True
+            else:
+                pending.append(stage)
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # Each worker gets a copy of the caller's context so its spans join the request trace
+            futures = {
+                executor.submit(contextvars.copy_context().run, self.run_stage, stage, product_name, context): stage
+                for stage in pending
+            }
+            for future in as_completed(futures):
+                stage = futures[future]
+                try:
+                    output = future.result()
+                except Exception as e:
+                    logger.error(f"Error in {stage} analysis: {str(e)}")
+                    ANALYST_ERRORS.inc(stage=stage)
+                    yield stage, "", str(e), False
+                    continue
+                self.cache_stage(stage, output, product_name=product_name, context=context)
+                yield stage, output, None, False
+
+    def run_analysts(self, product_name: str, context: str = "", reuse: bool = True,
+                     min_ttl: float = 0) -> Tuple[Dict[str, str], Dict[str, str], List[str]]:
+        """Run the market, consumer and industry crews concurrently.
+
+        A failing analyst does not abort the others: its result is left empty
+        and the error message is recorded under the stage name.
+
+        Returns:
+            tuple: (results keyed by stage, errors keyed by stage, reused stages)
+        """
+        results = {stage: "" for stage in ANALYST_STAGES}
+        errors = {}
+        reused = []
+        for stage, result, error, was_reused in self.iter_analysts(product_name, context, reuse, min_ttl):
+            results[stage] = result
+            if error:
+                errors[stage] = error
+            if was_reused:
+                reused.append(stage)
+        return results, errors, reused
+
+    def prepare_synthesis_input(self, stage_results: Dict[str, str]) -> Tuple[Dict[str, str], Dict]:
+        """Compact analyst outputs to the synthesis token budget.
+
+        Returns:
+            tuple: (outputs to synthesize, token counts before and after)
+        """
+        with span('compaction', stage='manager'):
+            if self.synthesis_token_budget > 0:
+                compacted, stats = compact_for_synthesis(stage_results, self.synthesis_token_budget)
+            else:
+                tokens = sum(estimate_tokens(output) for output in stage_results.values())
+                compacted, stats = stage_results, {'budget_tokens': 0, 'tokens_before': tokens, 'tokens_after': tokens}
+        SYNTHESIS_TOKENS.inc(stats['tokens_before'], phase='before')
+        SYNTHESIS_TOKENS.inc(stats['tokens_after'], phase='after')
+        return compacted, stats
+
+    def synthesize(self, product_name: str, context: str, stage_results: Dict[str, str]) -> str:
+        """Run the synthesis crew over the analyst outputs."""
+        synthesis_task = Task(
+            description=f"""
+            Synthesize the following research findings for {product_name} into strategic recommendations:
+            
+            Market Analysis:
+            {stage_results['market']}
+            
+            Consumer Analysis:
+            {stage_results['consumer']}
+            
+            Industry Analysis:
+            {stage_results['industry']}
+            
+            If provided, consider this additional context: {context}
+            
+            Focus on:
+            1. Key insights synthesis
+            2. Strategic opportunities
+            3. Risk assessment
+            4. Implementation considerations
+            5. Success metrics
+            
+            Format your response with clear sections and bullet points.
+            Conclude with prioritized action items.
+            """,
+            agent=self.create_agent(),
+            expected_output="A strategic synthesis of market research findings with actionable recommendations and implementation plan."
+        )
+        synthesis_crew = Crew(agents=[self.create_agent()], tasks=[synthesis_task], verbose=True)
+        with span('synthesis', stage='manager'):
+            output = synthesis_crew.kickoff()
+        record_token_usage('manager', output)
+        return str(output)
+
+    def run_synthesis(self, product_name: str, context: str, stage_results: Dict[str, str],
+                      reuse: bool = True, min_ttl: float = 0) -> Tuple[str, Optional[Dict], bool]:
+        """Synthesize, reusing the cached synthesis when no upstream output changed
+        and it does not expire within min_ttl seconds.
+
+        Returns:
+            tuple: (synthesis output, token counts or None if reused, whether it was reused)
+        """
+        inputs = dict(stage_results, product_name=product_name, context=context)
+        cached = self.get_cached_stage('manager', min_ttl, **inputs) if reuse else None
+        if cached is not None:
+            return cached, None, True
+
+        synthesis_input, synthesis_tokens = self.prepare_synthesis_input(stage_results)
+        final_result = self.synthesize(product_name, context, synthesis_input)
+        self.cache_stage('manager', final_result, **inputs)
+        return final_result, synthesis_tokens, False
+
+    def build_response(self, product_name: str, context: str, final_result: str,
+                       stage_results: Dict[str, str], errors: Dict[str, str],
+                       extra_metadata: Optional[Dict] = None) -> Dict:
+        """Format the complete response, record it in the report history and cache it if every analyst succeeded."""
+        response = {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'version': '2.0',
+                'status': 'partial_success' if errors else 'success',
+                **(extra_metadata or {})
+            },
+            'results': {
+                'manager': self.format_output(final_result),
+                'market': self.format_output(stage_results['market']),
+                'consumer': self.format_output(stage_results['consumer']),
+                'industry': self.format_output(stage_results['industry'])
+            },
+            'errors': errors
+        }
 
-    def analyze_task(self, product_name: str, context: str = "") -> str:
-        """Synthesize research findings and provide strategic recommendations."""
+        key = self.cache_key(product_name, context)
+        if self.report_store is not None:
+            try:
+                self.report_store.add(key, product_name, context, response)
+            except StoreError as e:
+                logger.error(f"Error recording report history: {str(e)}")
+
+        # Only cache complete reports so failed analysts are retried next time
+        if not errors:
+            self.cache.set(key, response)
+            self.key_index.add(key, f"{product_name}:{context}")
+        return response
+
+    def analyze_task(self, product_name: str, context: str = "", refresh: bool = False,
+                     min_stage_ttl: Optional[float] = None) -> str:
+        """Synthesize research findings and provide strategic recommendations.
+
+        With refresh, the cached report is ignored and a complete result
+        replaces it. Stage outputs still valid for more than min_stage_ttl
+        seconds are reused, so only expiring stages run again; without
+        min_stage_ttl every crew runs again.
+        """
         try:
             # Check cache first
-            cached_results = self.get_cached_analysis(product_name, context)
+            cached_results = None if refresh else self.get_cached_analysis(product_name, context)
             if cached_results:
                 logger.info("Found cached results")
-                return self.format_output(str(cached_results))
-
-            # Run individual analyst tasks first
-            market_task = Task(
-                description=f"""Analyze market opportunities for {product_name}.\n\nContext: {context}""",
-                agent=self.market_analyst.create_agent(),
-                expected_output="Market analysis with size, trends, and competition insights."
-            )
-            consumer_task = Task(
-                description=f"""Analyze consumer behavior for {product_name}.\n\nContext: {context}""",
-                agent=self.consumer_analyst.create_agent(),
-                expected_output="Consumer analysis with demographics and behavior patterns."
-            )
-            industry_task = Task(
-                description=f"""Analyze industry landscape for {product_name}.\n\nContext: {context}""",
-                agent=self.industry_analyst.create_agent(),
-                expected_output="Industry analysis with regulatory and technological insights."
-            )
-
-            # Run each analysis separately to ensure proper result handling
-            market_crew = Crew(agents=[self.market_analyst.create_agent()], tasks=[market_task], verbose=True)
-            consumer_crew = Crew(agents=[self.consumer_analyst.create_agent()], tasks=[consumer_task], verbose=True)
-            industry_crew = Crew(agents=[self.industry_analyst.create_agent()], tasks=[industry_task], verbose=True)
-
-            market_result = market_crew.kickoff()
-            consumer_result = consumer_crew.kickoff()
-            industry_result = industry_crew.kickoff()
-
-            # Synthesize results
-            synthesis_task = Task(
-                description=f"""
-                Synthesize the following research findings for {product_name} into strategic recommendations:
-                
-                Market Analysis:
-                {market_result}
-                
-                Consumer Analysis:
-                {consumer_result}
-                
-                Industry Analysis:
-                {industry_result}
-                
-                If provided, consider this additional context: {context}
-                
-                Focus on:
-                1. Key insights synthesis
-                2. Strategic opportunities
-                3. Risk assessment
-                4. Implementation considerations
-                5. Success metrics
-                
-                Format your response with clear sections and bullet points.
-                Conclude with prioritized action items.
-                """,
-                agent=self.create_agent(),
-                expected_output="A strategic synthesis of market research findings with actionable recommendations and implementation plan."
-            )
-
-            # Run synthesis
-            synthesis_crew = Crew(agents=[self.create_agent()], tasks=[synthesis_task], verbose=True)
-            final_result = synthesis_crew.kickoff()
-
-            # Format the complete response
-            response = {
-                'metadata': {
-                    'timestamp': datetime.now().isoformat(),
-                    'version': '2.0',
-                    'status': 'success'
-                },
-                'results': {
-                    'manager': self.format_output(str(final_result)),
-                    'market': self.format_output(str(market_result)),
-                    'consumer': self.format_output(str(consumer_result)),
-                    'industry': self.format_output(str(industry_result))
-                },
-                'errors': {}
-            }
+                return cached_results
+
+            reuse = not refresh or min_stage_ttl is not None
+            min_ttl = (min_stage_ttl or 0) if refresh else 0
+            stage_results, errors, reused = self.run_analysts(product_name, context, reuse=reuse, min_ttl=min_ttl)
+            if len(errors) == len(ANALYST_STAGES):
+                raise AgentError("All analyst stages failed")
 
-            # Cache the results
-            self.cache.set(f"{product_name}:{context}", response)
+            final_result, synthesis_tokens, synthesis_reused = self.run_synthesis(product_name, context, stage_results,
+                                                                                  reuse=reuse, min_ttl=min_ttl)
+            if synthesis_reused:
+                reused.append('manager')
 
             # Return the response directly without additional formatting
-            return response
+            return self.build_response(product_name, context, final_result, stage_results, errors,
+                                       extra_metadata={'synthesis_tokens': synthesis_tokens, 'reused_stages': reused})
             
         except Exception as e:
             logger.error(f"Error in research synthesis: {str(e)}")
             # Return error in standardized format
-            return self.format_output(f"Error: {str(e)}")
\ No newline at end of file
+            return self.format_output(f"Error: {str(e)}")
+
+    @staticmethod
+    def comparison_cache_key(products: List[str], context: str, stage_results: Dict[str, Dict[str, str]]) -> str:
+        """Key for a comparative synthesis, built from every product's analyst outputs."""
+        digest = hashlib.sha1(normalize_text(context).encode())
+        for product in sorted(products, key=normalize_product):
+            digest.update(normalize_product(product).encode())
+            for stage in ANALYST_STAGES:
+                digest.update(hashlib.sha1(stage_results[product][stage].encode()).digest())
+        return f"stage:comparison:{digest.hexdigest()}"
+
+    def synthesize_comparison(self, products: List[str], context: str,
+                              stage_results: Dict[str, Dict[str, str]]) -> str:
+        """Run one synthesis crew comparing every product's analyst outputs."""
+        findings = "\n".join(f"""
+            {product}
+            Market Analysis:
+            {stage_results[product]['market']}
+
+            Consumer Analysis:
+            {stage_results[product]['consumer']}
+
+            Industry Analysis:
+            {stage_results[product]['industry']}
+            """ for product in products)
+        comparison_task = Task(
+            description=f"""
+            Compare the following products using their research findings and turn the comparison
+            into strategic recommendations: {', '.join(products)}
+            {findings}
+            If provided, consider this additional context: {context}
+
+            Focus on:
+            1. Head-to-head comparison of market position, consumer appeal and industry outlook
+            2. Relative strengths and weaknesses of each product
+            3. Opportunities and risks specific to each product
+            4. Which product to prioritize and why
+
+            Format your response with clear sections and bullet points.
+            Conclude with prioritized action items.
+            """,
+            agent=self.create_agent(),
+            expected_output="A comparative strategic synthesis of the products with a recommended priority and action items."
+        )
+        comparison_crew = Crew(agents=[self.create_agent()], tasks=[comparison_task], verbose=True)
+        with span('synthesis', stage='comparison'):
+            output = comparison_crew.kickoff()
+        record_token_usage('comparison', output)
+        return str(output)
+
+    def run_comparison(self, products: List[str], context: str, stage_results: Dict[str, Dict[str, str]],
+                       reuse: bool = True) -> Tuple[str, Optional[Dict], bool]:
+        """Compare products in one synthesis, reusing it when no analyst output changed.
+
+        All products share the synthesis token budget.
+
+        Returns:
+            tuple: (synthesis output, token counts or None if reused, whether it was reused)
+        """
+        key = self.comparison_cache_key(products, context, stage_results)
+        if reuse:
+            with span('cache_lookup', stage='comparison'):
+                cached = self.cache.get(key)
+            CACHE_LOOKUPS.inc(cache='stage_comparison', result='hit' if cached else 'miss')
+            if cached:
+                return cached['output'], None, True
+
+        sections = {(product, stage): f"{product} {stage}" for product in products for stage in ANALYST_STAGES}
+        compacted, synthesis_tokens = self.prepare_synthesis_input(
+            {name: stage_results[product][stage] for (product, stage), name in sections.items()}
+        )
+        synthesis_input = {product: {} for product in products}
+        for (product, stage), name in sections.items():
+            synthesis_input[product][stage] = compacted[name]
+        final_result = self.synthesize_comparison(products, context, synthesis_input)
+        self.cache.set(key, {'output': final_result}, ttl_hours=STAGE_CACHE_POLICY['manager']['ttl_hours'])
+        return final_result, synthesis_tokens, False
+
+    def compare_task(self, products: List[str], context: str,
+                     analyses: Dict[str, Tuple[Dict[str, str], Dict[str, str], List[str]]]) -> Dict:
+        """Compare products from their analyst results with a single synthesis.
+
+        Args:
+            products (list): Product names, in display order
+            context (str): Context shared by every product
+            analyses (dict): run_analysts() results keyed by product
+
+        Returns:
+            dict: Standard-format response with the comparison, each product's
+            sections and the analysts' charts merged across products
+
+        Raises:
+            AgentError: If no product has any analyst output
+        """
+        stage_results = {product: analyses[product][0] for product in products}
+        errors = {f"{product}:{stage}": error
+                  for product in products for stage, error in analyses[product][1].items()}
+        if len(errors) == len(products) * len(ANALYST_STAGES):
+            raise AgentError("All analyst stages failed")
+
+        final_result, synthesis_tokens, reused = self.run_comparison(products, context, stage_results)
+
+        charts = []
+        for stage in ANALYST_STAGES:
+            parsed = {product: parse_structured_output(stage_results[product][stage])[1] for product in products}
+            for chart in merge_charts(parsed):
+                chart['stage'] = stage
+                charts.append(chart)
+
+        return {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'version': '2.0',
+                'status': 'partial_success' if errors else 'success',
+                'products': products,
+                'synthesis_tokens': synthesis_tokens,
+                'reused_stages': {product: analyses[product][2] for product in products},
+                'comparison_reused': reused
+            },
+            'results': {
+                'comparison': self.format_output(final_result),
+                'products': {
+                    product: {stage: self.format_output(output) for stage, output in stage_results[product].items()}
+                    for product in products
+                },
+                'charts': charts
+            },
+            'errors': errors
+        }
+
+    def stage_event(self, stage: str, output: str, error: Optional[str] = None) -> Dict:
+        """Build a streaming event for one stage with its parsed charts and tables."""
+        content, charts, tables = parse_structured_output(output or "")
+        event = self.format_structured_output(content, charts=charts, tables=tables)
+        event['stage'] = stage
+        event['status'] = 'error' if error else 'success'
+        if error:
+            event['error'] = error
+        return event
+
+    def analyze_stream(self, product_name: str, context: str = "") -> Iterator[Dict]:
+        """Run the analysis, yielding an event per stage as soon as it is ready.
+
+        Analyst events arrive in completion order, followed by the manager
+        synthesis and a final 'complete' event carrying the full response.
+        """
+        cached_results = self.get_cached_analysis(product_name, context)
+        if cached_results:
+            logger.info("Found cached results")
+            for stage in (*ANALYST_STAGES, 'manager'):
+                yield self.stage_event(stage, cached_results['results'].get(stage, ""))
+            yield {'stage': 'complete', 'status': 'success', 'response': cached_results}
+            return
+
+        stage_results = {stage: "" for stage in ANALYST_STAGES}
+        errors = {}
+        reused = []
+        for stage, result, error, was_reused in self.iter_analysts(product_name, context):
+            stage_results[stage] = result
+            if error:
+                errors[stage] = error
+            if was_reused:
+                reused.append(stage)
+            yield self.stage_event(stage, result, error)
+
+        if len(errors) == len(ANALYST_STAGES):
+            raise AgentError("All analyst stages failed")
+
+        final_result, synthesis_tokens, synthesis_reused = self.run_synthesis(product_name, context, stage_results)
+        if synthesis_reused:
+            reused.append('manager')
+        yield self.stage_event('manager', final_result)
+        response = self.build_response(product_name, context, final_result, stage_results, errors,
+                                       extra_metadata={'synthesis_tokens': synthesis_tokens, 'reused_stages': reused})
+        yield {'stage': 'complete', 'status': response['metadata']['status'], 'response': response}
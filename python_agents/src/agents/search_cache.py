@@ -0,0 +1,91 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from .cache import Cache
+from .metrics import CACHE_LOOKUPS, span
+from .single_flight import SingleFlight
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+
+class SearchCache:
+    """Process-wide cache of web search results shared by every agent.
+
+    Queries are normalized before lookup so trivially different phrasings of
+    the same search hit one entry, and concurrent identical searches are
+    collapsed into a single upstream call.
+    """
+
+    def __init__(self, ttl_hours: Optional[float] = None, max_entries: Optional[int] = None,
+                 latency_window: int = 1000):
+        if ttl_hours is None:
+            ttl_hours = float(os.getenv("SEARCH_CACHE_TTL_HOURS", 6))
+        if max_entries is None:
+            max_entries = int(os.getenv("SEARCH_CACHE_MAX_SIZE", 2000))
+        self._cache = Cache(ttl_hours=ttl_hours, max_entries=max_entries)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._fetches = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Casefold, collapse whitespace and trim surrounding punctuation."""
+        query = _WHITESPACE.sub(" ", str(query).casefold()).strip()
+        return _EDGE_PUNCTUATION.sub("", query)
+
+    def make_key(self, query: str, **params) -> str:
+        """Cache key for a query plus any extra search parameters."""
+        key = self.normalize_query(query)
+        if params:
+            key += "|" + json.dumps(params, sort_keys=True, default=str)
+        return key
+
+    def _fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        with span('search'):
+            result = fetch()
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+            self._fetches += 1
+        if result:
+            self._cache.set(key, result)
+        return result
+
+    def search(self, query: str, fetch: Callable[[], Any], **params) -> Any:
+        """Return the cached result for query, calling fetch on a miss."""
+        key = self.make_key(query, **params)
+        cached = self._cache.get(key)
+        CACHE_LOOKUPS.inc(cache='search', result='hit' if cached is not None else 'miss')
+        if cached is not None:
+            return cached
+        result, _ = self._flight.do(key, self._fetch, key, fetch)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached search result."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Hit rate, upstream fetch count and fetch latency in milliseconds."""
+        stats = self._cache.get_stats()
+        with self._lock:
+            latencies = sorted(self._latencies)
+            fetches = self._fetches
+        stats['fetches'] = fetches
+        stats['coalesced'] = self._flight.get_stats()['coalesced']
+        if latencies:
+            stats['latency_ms'] = {
+                'avg': 1000 * sum(latencies) / len(latencies),
+                'p50': 1000 * latencies[len(latencies) // 2],
+                'p95': 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'max': 1000 * latencies[-1]
+            }
+        return stats
+
+
+search_cache = SearchCache()
@@ -0,0 +1,19 @@
+from typing import Any
+from crewai_tools import SerperDevTool
+from .rate_limit import get_limiter
+from .search_cache import search_cache
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that serves repeat queries from the shared search cache.
+
+    Misses go upstream through the process-wide Serper rate limiter.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        query = kwargs.get('search_query') or kwargs.get('query') or ""
+        params = {k: v for k, v in kwargs.items() if k not in ('search_query', 'query')}
+        return search_cache.search(
+            query,
+            lambda: get_limiter('serper').call(super(CachedSerperDevTool, self)._run, **kwargs),
+            **params
+        )
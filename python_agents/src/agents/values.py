@@ -0,0 +1,249 @@
+import re
+from typing import Dict, List, Optional, Sequence
+
+# Magnitude suffixes, by every spelling analysts use, and their multipliers
+SCALES = {'': 1.0, 'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+_SCALE_NAMES = {
+    'k': 'K', 'thousand': 'K',
+    'm': 'M', 'mn': 'M', 'mm': 'M', 'million': 'M',
+    'b': 'B', 'bn': 'B', 'billion': 'B',
+    't': 'T', 'tn': 'T', 'trillion': 'T'
+}
+CURRENCIES = {'$': 'USD', 'us$': 'USD', '€': 'EUR', '£': 'GBP', '¥': 'JPY', '₹': 'INR',
+              'usd': 'USD', 'eur': 'EUR', 'gbp': 'GBP', 'jpy': 'JPY', 'inr': 'INR', 'cny': 'CNY'}
+
+_SYMBOL = r'US\$|[$€£¥₹]'
+_CODE = r'\b(?:USD|EUR|GBP|JPY|INR|CNY)\b'
+_NUMBER = r'\d[\d,]*(?:\.\d+)?|\.\d+'
+_SCALE = r'(?:thousand|million|billion|trillion|bn|mn|mm|tn|[kmbt])(?![a-z])'
+# "$1.2B", "500K", "12.5%", "10-20%", "$1.2B to $1.5B", "-3%", "-$5M", "-5% to -3%", "EUR 40M", "40M USD"
+_VALUE_PATTERN = re.compile(
+    rf'(?P<sign>[-−])?\s*(?P<currency>{_SYMBOL}|{_CODE})?\s*(?P<currency_sign>[-−])?\s*'
+    rf'(?P<low>{_NUMBER})\s*(?P<low_scale>{_SCALE})?\s*(?P<low_percent>%)?'
+    rf'(?:\s*(?:-|–|—|to)\s*(?P<high_sign>[-−])?\s*(?:{_SYMBOL})?\s*(?P<high_currency_sign>[-−])?\s*'
+    rf'(?P<high>{_NUMBER})\s*(?P<high_scale>{_SCALE})?\s*(?P<percent>%)?)?'
+    rf'(?:\s*(?P<code>{_CODE}))?',
+    re.IGNORECASE
+)
+# "- Label: value" chart items; the label runs to the last colon so "Q1 2023" or
+# "18-24" survive. Plain values such as "$150M", "-2.5" or "40%" are split into
+# sign and currency, number, and suffix by the same scan; any other value text
+# is captured whole for _VALUE_PATTERN.
+_ITEM_PATTERN = re.compile(
+    r'^[ \t]*[-*•][ \t]*([^\n]+):[ \t]*'
+    r'(?:(-?\$?)(\d+(?:\.\d+)?)[ \t]*([kmbt]?%?)[ \t]*|([^\n]*))$',
+    re.MULTILINE | re.IGNORECASE
+)
+_PROJECTED_PATTERN = re.compile(r'\b(?:projected|forecast(?:ed)?|estimated|expected)\b', re.IGNORECASE)
+
+
+def _value_row(match: Optional[re.Match]) -> Optional[tuple]:
+    """(value, low, high, percent, scale, currency) for one _VALUE_PATTERN match.
+
+    Numbers are in the value's own scale; low and high are None unless it is
+    a range, and value is then the midpoint.
+    """
+    if match is None:
+        return None
+    (sign, symbol, symbol_sign, low, low_scale, low_percent,
+     high_sign, high_symbol_sign, high, high_scale, high_percent, code) = match.groups('')
+    low_name = _SCALE_NAMES[low_scale.lower()] if low_scale else ''
+    high_name = _SCALE_NAMES[high_scale.lower()] if high_scale else ''
+    low_value = float(low.replace(',', ''))
+    if sign or symbol_sign:
+        low_value = -low_value
+    currency = CURRENCIES.get((symbol or code).lower()) if symbol or code else None
+    if not high:
+        return low_value, None, None, bool(low_percent), low_name or None, currency
+
+    # "1-2B": a suffix on the upper bound applies to both
+    scale = low_name or high_name
+    high_value = float(high.replace(',', ''))
+    if high_sign or high_symbol_sign:
+        high_value = -high_value
+    if high_name and high_name != scale:
+        high_value = round(high_value * SCALES[high_name] / SCALES[scale], 6)
+    return ((low_value + high_value) / 2, low_value, high_value,
+            bool(low_percent or high_percent), scale or None, currency)
+
+
+def _suffix_scale(suffix: str) -> Optional[str]:
+    return _SCALE_NAMES[suffix[0].lower()] if suffix[:1].isalpha() else None
+
+
+def _plain_row(prefix: str, number: str, suffix: str) -> tuple:
+    """_value_row's result for a plain value split by _ITEM_PATTERN."""
+    value = float(number)
+    return (-value if prefix.startswith('-') else value, None, None, suffix.endswith('%'),
+            _suffix_scale(suffix), 'USD' if prefix.endswith('$') else None)
+
+
+def _mentions_projection(text: str) -> bool:
+    """Whether text has a stem of _PROJECTED_PATTERN's words; rules most charts out without the regex."""
+    lowered = text.lower()
+    return 'project' in lowered or 'forecast' in lowered or 'estimat' in lowered or 'expect' in lowered
+
+
+def _most_common(values: Sequence[Optional[str]]) -> Optional[str]:
+    distinct = set(values)
+    distinct.discard(None)
+    if len(distinct) <= 1:
+        return distinct.pop() if distinct else None
+    present = [value for value in values if value]
+    # dict.fromkeys keeps first-seen order, so ties go to the earlier value
+    return max(dict.fromkeys(present), key=present.count)
+
+
+def _chart_unit(count: int, percent: int, currencies: Sequence[Optional[str]],
+                scales: Sequence[Optional[str]]) -> Dict:
+    """Unit of a chart of count values, percent of them percentages."""
+    if count and 2 * percent >= count:
+        return {'type': 'percent', 'currency': None, 'scale': None, 'multiplier': 1.0}
+    currency = _most_common(currencies)
+    scale = _most_common(scales)
+    return {'type': 'currency' if currency else 'number', 'currency': currency,
+            'scale': scale, 'multiplier': SCALES[scale or '']}
+
+
+def _conflicts(unit: Dict, percent: bool, currency: Optional[str]) -> bool:
+    """Whether a value names a unit other than the chart's; bare numbers take the chart's unit."""
+    if unit['type'] == 'percent':
+        return currency is not None
+    return percent or currency is not None and currency != unit['currency']
+
+
+def _normalize(valid: List[bool], value: Sequence[float], low: Optional[Sequence], high: Optional[Sequence],
+               unit: Dict, scales: Sequence[Optional[str]], projected: Optional[List[bool]],
+               mismatched: Optional[List[bool]] = None) -> Dict:
+    """Express the parsed columns of a chart's valid values in its unit.
+
+    low and high are None when no value is a range, projected and mismatched
+    None when no value is projected or in another unit. Mismatched values
+    become None rather than being plotted on the wrong axis.
+    """
+    # Values already in the chart's scale, and bare numbers, which take it, are
+    # used as parsed; only rescaled ones are rounded, to drop float noise such
+    # as 1.2 * 1e9 / 1e6
+    factors = {name: 1.0 if name is None else SCALES[name] / unit['multiplier'] for name in set(scales)}
+    if set(factors.values()) <= {1.0}:
+        data = list(value)
+        ranges = [None] * len(data) if low is None else [None if lo is None else [lo, hi] for lo, hi in zip(low, high)]
+    else:
+        if low is None:
+            low = high = (None,) * len(value)
+        data = []
+        ranges = []
+        for row_value, row_low, row_high, name in zip(value, low, high, scales):
+            factor = factors[name]
+            if factor == 1.0:
+                data.append(row_value)
+                ranges.append(None if row_low is None else [row_low, row_high])
+            else:
+                data.append(round(row_value * factor, 6))
+                ranges.append(None if row_low is None
+                              else [round(row_low * factor, 6), round(row_high * factor, 6)])
+
+    if mismatched:
+        data = [None if flag else point for point, flag in zip(data, mismatched)]
+        ranges = [None if flag else value_range for value_range, flag in zip(ranges, mismatched)]
+
+    return {
+        'valid': valid,
+        'data': data,
+        'ranges': ranges,
+        'projected': [False] * len(data) if projected is None else [flag for flag, ok in zip(projected, valid) if ok],
+        'mismatched': mismatched or [False] * len(data),
+        'unit': unit
+    }
+
+
+def _normalize_rows(rows: List[Optional[tuple]], projected: Optional[List[bool]]) -> Dict:
+    present = [row for row in rows if row]
+    value, low, high, percent, scales, currencies = zip(*present) if present else ((),) * 6
+    unit = _chart_unit(len(value), percent.count(True), currencies, scales)
+    mismatched = [_conflicts(unit, *flags) for flags in zip(percent, currencies)]
+    return _normalize([row is not None for row in rows], value, low, high, unit, scales, projected,
+                      mismatched if any(mismatched) else None)
+
+
+def _projected(labels: Sequence[str], texts: Sequence[str]) -> List[bool]:
+    return [bool(_PROJECTED_PATTERN.search(label) or _PROJECTED_PATTERN.search(text))
+            for label, text in zip(labels, texts)]
+
+
+def normalize_values(texts: Sequence[str], labels: Optional[Sequence[str]] = None) -> Dict:
+    """Parse a chart's values into one consistent numeric list and its unit.
+
+    The chart unit is a percentage when most values are percentages,
+    otherwise a currency when any value names one, expressed in the most
+    common magnitude suffix so "$500K" and "$1.2B" plot as 0.5 and 1200
+    against "$150M", while a bare "75" takes the chart's unit. Ranges plot at
+    their midpoint. A value naming another unit, such as "$50M" in a chart of
+    percentages, is left out.
+
+    Args:
+        texts: Value strings such as "$1.2B", "500K", "10-20%"
+        labels: Matching labels, checked for "(projected)" style annotations
+
+    Returns:
+        dict: 'valid' flags of parseable values; 'data', 'ranges',
+        'projected' and 'mismatched' lists for the valid values (ranges None
+        where a value is a single number, data None where it names another
+        unit than the chart's); and 'unit' with 'type' (percent, currency or
+        number), 'currency', 'scale' and 'multiplier'
+    """
+    labels = labels or [''] * len(texts)
+    rows = [_value_row(_VALUE_PATTERN.search(text)) for text in texts]
+    projected = _projected(labels, texts) if _mentions_projection("\n".join([*labels, *texts])) else None
+    return _normalize_rows(rows, projected)
+
+
+def normalize_chart(body: str) -> Optional[Dict]:
+    """Parse the "- Label: value" items of a CHART_DATA body in one scan.
+
+    Charts whose values are all plain numbers are converted column by column
+    without per-value tokenizing.
+
+    Returns:
+        dict: normalize_values' result plus 'labels' of every item, or None
+        when the body has no items
+    """
+    items = _ITEM_PATTERN.findall(body)
+    if not items:
+        return None
+
+    labels, prefixes, numbers, suffixes, texts = zip(*items)
+    labels = [label.strip() for label in labels]
+    # A plain value has no words, so only its label can mark it projected
+    projected = _projected(labels, texts) if _mentions_projection(body) else None
+    distinct = set(suffixes)
+    percent = sum(suffixes.count(suffix) for suffix in distinct if suffix.endswith('%'))
+    signs = "".join(prefixes)
+    # Plain values can only conflict when percentages are mixed with other values or "$"
+    if not all(numbers) or 0 < percent < len(items) or percent and '$' in signs:
+        rows = [_plain_row(prefix, number, suffix) if number else _value_row(_VALUE_PATTERN.search(text))
+                for prefix, number, suffix, text in zip(prefixes, numbers, suffixes, texts)]
+        values = _normalize_rows(rows, projected)
+    else:
+        value = list(map(float, numbers))
+        if '-' in signs:
+            value = [-number if prefix.startswith('-') else number for number, prefix in zip(value, prefixes)]
+        if len(distinct) == 1:
+            scales = (_suffix_scale(suffixes[0]),) * len(value)
+        else:
+            scales = [_suffix_scale(suffix) for suffix in suffixes]
+        # "$" is the only currency a plain value can name, so its presence decides the unit
+        unit = _chart_unit(len(value), percent, ('USD',) if '$' in signs else (), scales)
+        values = _normalize([True] * len(value), value, None, None, unit, scales, projected)
+    values['labels'] = labels
+    return values
+
+
+def unit_label(unit: Optional[Dict]) -> Optional[str]:
+    """Short unit text such as "%", "USD M" or "K"; None for plain numbers."""
+    if not unit:
+        return None
+    if unit['type'] == 'percent':
+        return '%'
+    label = " ".join(part for part in (unit.get('currency'), unit.get('scale')) if part)
+    return label or None
@@ -0,0 +1,165 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..agents.exceptions import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class Job:
+    """A unit of background work and its outcome."""
+
+    def __init__(self, job_id: str, params: Dict):
+        self.id = job_id
+        self.params = params
+        self.status = QUEUED
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        # Monotonic completion time, used for retention
+        self.done_at: Optional[float] = None
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': self.error
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobQueue:
+    """Bounded background worker pool for long-running analyses.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more
+    wait for a worker; further submissions raise QueueFullError. Finished jobs
+    are kept for ``retention_seconds`` so clients can fetch their result.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 retention_seconds: Optional[float] = None):
+        if max_workers is None:
+            max_workers = int(os.getenv("JOB_MAX_WORKERS", 2))
+        if max_queue is None:
+            max_queue = int(os.getenv("JOB_MAX_QUEUE", 20))
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("JOB_RETENTION_SECONDS", 3600))
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._pending = 0
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.done_at is not None and job.done_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = datetime.now()
+        job.done_at = time.monotonic()
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: Dict) -> None:
+        try:
+            with self._lock:
+                # Cancelled after the worker picked it up; still release the slot below
+                if job.status == CANCELLED:
+                    return
+                job.status = RUNNING
+                job.started_at = datetime.now()
+            result = fn(*args, **kwargs)
+            with self._lock:
+                # A job cancelled while running still finishes; its result is discarded
+                if job.status != CANCELLED:
+                    job.result = result
+                    self._finish(job, COMPLETED)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            with self._lock:
+                if job.status != CANCELLED:
+                    job.error = str(e)
+                    self._finish(job, FAILED)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def submit(self, fn: Callable[..., Any], *args, params: Optional[Dict] = None, **kwargs) -> Job:
+        """Queue fn for background execution.
+
+        Raises:
+            QueueFullError: If every worker is busy and the queue is full
+        """
+        with self._lock:
+            self._prune()
+            if self._pending >= self.max_workers + self.max_queue:
+                raise QueueFullError("Analysis queue is full, try again later")
+            job = Job(uuid.uuid4().hex, params or {})
+            self._jobs[job.id] = job
+            self._pending += 1
+        try:
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job. Queued jobs never start; running jobs have their result discarded."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in (COMPLETED, FAILED, CANCELLED):
+                return job
+            if job.status == QUEUED and job.future is not None and job.future.cancel():
+                self._pending -= 1
+            self._finish(job, CANCELLED)
+            return job
+
+    def get_stats(self) -> Dict:
+        """Get queue statistics."""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'jobs': counts
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and cancel jobs that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
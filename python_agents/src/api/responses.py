@@ -0,0 +1,112 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(content, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag from a hash of the uncompressed body, shared by every encoding of it."""
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, preferring brotli when available."""
+    accepted = {}
+    for part in (accept_encoding or "").split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompactJSONResponse(Response):
+    """JSONResponse replacement that serializes with dumps()."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def report_response(request: Request, content: Any, status_code: int = 200,
+                    headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize a report with an ETag, answering 304 or compressing as the request allows.
+
+    Args:
+        request: The incoming request, for If-None-Match and Accept-Encoding
+        content: JSON-serializable report
+        status_code: Status for a full response
+        headers: Extra response headers
+    """
+    body = dumps(content)
+    etag = content_etag(body)
+    response_headers = {'ETag': etag, 'Vary': 'Accept-Encoding'}
+    response_headers.update(headers or {})
+
+    # Conditional 304s only apply to safe methods; POSTs always get the body
+    if (request.method in ('GET', 'HEAD') and status_code == 200
+            and etag_matches(request.headers.get('if-none-match'), etag)):
+        return Response(status_code=304, headers=response_headers)
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get('accept-encoding'))
+        if encoding is not None:
+            body = compress(body, encoding)
+            response_headers['Content-Encoding'] = encoding
+    return Response(content=body, status_code=status_code, headers=response_headers,
+                    media_type="application/json")
@@ -0,0 +1,31 @@
+"""Load the FastAPI app with the offline crewai and search stubs from benchmarks.stubs."""
+import importlib.util
+import json
+import os
+
+from benchmarks import stubs
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_api(monkeypatch, **env):
+    """Import a fresh copy of src/api/main.py, with its own manager pool, against the stubs."""
+    stubs.install(llm_latency=0, search_latency=0)
+    monkeypatch.syspath_prepend(REPO_ROOT)
+    monkeypatch.delenv('CACHE_DB_PATH', raising=False)
+    monkeypatch.setenv('REPORT_DB_PATH', ':memory:')
+    for name, value in env.items():
+        monkeypatch.setenv(name, str(value))
+    spec = importlib.util.spec_from_file_location("stub_api_main", os.path.join(REPO_ROOT, "src", "api", "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_events(body: str):
+    """Parse a Server-Sent Events body into (event name, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
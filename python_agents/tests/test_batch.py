@@ -0,0 +1,74 @@
+import importlib
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks import stubs
+
+stubs.install(llm_latency=0, search_latency=0)
+
+from src.agents.cache import Cache
+from src.agents.pool import ManagerPool
+from src.agents.report_store import ReportStore
+from stub_api import load_api, read_events
+
+ITEMS = [
+    {'product_name': "Smart Watch", 'context': "fitness"},
+    {'product_name': "Broken Gadget"},
+    {'product_name': "smart watches", 'context': "Fitness"},
+    {'product_name': "Fitness Band"},
+]
+
+
+def slow_and_failing_stages(monkeypatch, research_manager):
+    """Make every stage take 50ms and every stage for "Broken Gadget" fail."""
+    run_stage = research_manager.ResearchManager.run_stage
+
+    def run(self, stage, product_name, context=""):
+        time.sleep(0.05)
+        if product_name == "Broken Gadget":
+            raise RuntimeError("provider down")
+        return run_stage(self, stage, product_name, context)
+
+    monkeypatch.setattr(research_manager.ResearchManager, 'run_stage', run)
+
+
+def check_batch(events):
+    items = {event['product_name']: event for event in events[:-1]}
+    summary = events[-1]
+
+    assert [event['stage'] for event in events] == ['item'] * 3 + ['summary']
+    assert items["Smart Watch"]['indexes'] == [0, 2]
+    assert items["Smart Watch"]['status'] == 'success' and items["Smart Watch"]['response']['results']
+    assert items["Fitness Band"]['indexes'] == [3] and items["Fitness Band"]['error'] is None
+    broken = items["Broken Gadget"]
+    assert broken['indexes'] == [1] and broken['status'] == 'error' and broken['response'] is None
+    assert "All analyst stages failed" in broken['error']
+
+    assert {key: summary[key] for key in ('items', 'unique_items', 'duplicates', 'succeeded', 'failed')} == \
+        {'items': 4, 'unique_items': 3, 'duplicates': 1, 'succeeded': 2, 'failed': 1}
+    assert summary['serial_ms'] == pytest.approx(sum(event['duration_ms'] for event in events[:-1]), abs=0.5)
+    # Three items ran side by side, so the batch took well under the serial sum
+    assert summary['wall_ms'] < summary['serial_ms'] * 0.8
+    assert summary['speedup'] > 1.2
+
+
+def test_analyze_batch_dedupes_and_reports_every_item(monkeypatch):
+    slow_and_failing_stages(monkeypatch, importlib.import_module('src.agents.research_manager'))
+    pool = ManagerPool(size=3, cache=Cache(), report_store=ReportStore())
+
+    check_batch(list(pool.analyze_batch(ITEMS)))
+
+
+def test_api_streams_batch_events(monkeypatch):
+    api = load_api(monkeypatch, RESEARCH_POOL_SIZE=3)
+    slow_and_failing_stages(monkeypatch, importlib.import_module('python_agents.src.agents.research_manager'))
+    with TestClient(api.app) as client:
+        response = client.post("/analyze/batch", json={'items': ITEMS})
+        invalid = [client.post("/analyze/batch", json=body).status_code
+                   for body in ([], {'items': ["Smart Watch"]}, [{'context': "fitness"}])]
+
+    assert response.status_code == 200
+    check_batch([event for _, event in read_events(response.text)])
+    assert invalid == [400, 400, 400]
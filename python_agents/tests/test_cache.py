@@ -0,0 +1,73 @@
+from src.agents.cache import Cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_and_expiry():
+    clock = FakeClock()
+    cache = Cache(ttl_hours=1, clock=clock)
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+
+    clock.now = 3600
+    assert cache.get("a") is None
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['expired_entries'] == 1
+
+
+def test_lru_eviction_by_entries():
+    cache = Cache(max_entries=2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    cache.get("a")
+    cache.set("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_eviction_by_bytes():
+    cache = Cache(max_bytes=100)
+    cache.set("a", {"text": "x" * 60})
+    cache.set("b", {"text": "y" * 60})
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get_stats()['total_bytes'] <= 100
+
+
+def test_sweep_keeps_memory_flat():
+    clock = FakeClock()
+    cache = Cache(ttl_hours=1, clock=clock)
+    for i in range(1000):
+        clock.now = i * 60
+        cache.set(f"key-{i % 10}", {"value": i})
+
+    assert cache.get_stats()['total_entries'] <= 10
+    assert len(cache._expiry_heap) <= 2 * 10 + 64
+
+
+def test_stale_entries_readable_within_grace():
+    clock = FakeClock()
+    cache = Cache(ttl_hours=1, stale_grace_hours=1, clock=clock)
+    cache.set("a", {"value": 1})
+    assert cache.get_stale("a") is None
+
+    clock.now = 3600 + 60
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == ({"value": 1}, 60)
+
+    clock.now = 2 * 3600
+    assert cache.get_stale("a") is None
+    cache.cleanup_expired()
+    assert cache.get_stats()['total_entries'] == 0
@@ -0,0 +1,26 @@
+from src.agents.compaction import compact_for_synthesis, estimate_tokens
+
+
+def test_markers_become_compact_json_and_duplicates_drop():
+    stage_results = {
+        'market': '## Market\nThe market is growing quickly in North America.\n'
+                  '[CHART_DATA type=pie title="Share"]\n- A: 60%\n- B: 40%\n[/CHART_DATA]',
+        'consumer': '## Consumer\nThe market is growing quickly in North America.\nBuyers value price.',
+    }
+    compacted, stats = compact_for_synthesis(stage_results, budget_tokens=1000)
+
+    assert '{"chart":"Share","data":{"A":60.0,"B":40.0}}' in compacted['market']
+    assert 'growing quickly' not in compacted['consumer']
+    assert 'Buyers value price.' in compacted['consumer']
+    assert stats['tokens_after'] < stats['tokens_before']
+
+
+def test_trimming_respects_budget_and_keeps_figures():
+    filler = "\n".join(f"Qualitative observation number {word} about buyers." for word in "abcdefghij" * 5)
+    stage_results = {'market': "## Size\nThe market reached $5B in 2023.\n" + filler}
+    compacted, stats = compact_for_synthesis(stage_results, budget_tokens=60)
+
+    assert stats['tokens_after'] <= 60
+    assert "## Size" in compacted['market']
+    assert "$5B in 2023" in compacted['market']
+    assert estimate_tokens(compacted['market']) <= 60
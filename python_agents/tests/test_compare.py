@@ -0,0 +1,73 @@
+import importlib
+
+from fastapi.testclient import TestClient
+
+from benchmarks import stubs
+
+stubs.install(llm_latency=0, search_latency=0)
+
+from src.agents.research_manager import ANALYST_STAGES
+from stub_api import load_api
+
+
+def count_syntheses(monkeypatch):
+    research_manager = importlib.import_module('python_agents.src.agents.research_manager')
+    synthesize = research_manager.ResearchManager.synthesize_comparison
+    calls = []
+
+    def spy(self, *args, **kwargs):
+        calls.append(args)
+        return synthesize(self, *args, **kwargs)
+
+    monkeypatch.setattr(research_manager.ResearchManager, 'synthesize_comparison', spy)
+    return calls
+
+
+def test_compare_reuses_analyses_and_synthesizes_once(monkeypatch):
+    api = load_api(monkeypatch)
+    syntheses = count_syntheses(monkeypatch)
+    with TestClient(api.app) as client:
+        assert client.post("/analyze", json={'product_name': "Smart Watch", 'context': "fitness"}).status_code == 200
+        calls = stubs.CALLS['llm']
+        first = client.post("/compare", json={'products': ["Smart Watch", "Fitness Band"], 'context': "fitness"})
+        # Only the new product's analysts and the one comparative synthesis call the LLM
+        assert stubs.CALLS['llm'] - calls == len(ANALYST_STAGES) + 1
+
+        calls = stubs.CALLS['llm']
+        again = client.post("/compare", json={'products': ["fitness band", "Smart Watch"], 'context': "Fitness"})
+        assert stubs.CALLS['llm'] == calls
+
+    assert first.status_code == 200 and again.status_code == 200
+    assert len(syntheses) == 1
+    metadata = first.json()['metadata']
+    assert metadata['products'] == ["Smart Watch", "Fitness Band"]
+    assert metadata['reused_stages'] == {"Smart Watch": list(ANALYST_STAGES), "Fitness Band": []}
+    assert metadata['comparison_reused'] is False
+    assert again.json()['metadata']['comparison_reused'] is True
+
+    results = first.json()['results']
+    assert set(results['products']) == {"Smart Watch", "Fitness Band"}
+    assert results['comparison'] == again.json()['results']['comparison']
+    charts = results['charts']
+    assert {(chart['stage'], chart['title']) for chart in charts} == \
+        {(stage, title) for stage in ANALYST_STAGES for title in ("Market Growth Trend", "Market Share Distribution")}
+    for chart in charts:
+        assert [dataset['label'] for dataset in chart['data']['datasets']] == ["Smart Watch", "Fitness Band"]
+        assert all(len(dataset['data']) == len(chart['data']['labels']) for dataset in chart['data']['datasets'])
+
+
+def test_compare_rejects_invalid_products(monkeypatch):
+    api = load_api(monkeypatch)
+    with TestClient(api.app) as client:
+        calls = stubs.CALLS['llm']
+        statuses = [client.post("/compare", json=body).status_code for body in (
+            {'products': ["Smart Watch"]},
+            {'products': ["Smart Watch", "smart watches"]},
+            {'products': ["Smart Watch", ""]},
+            {'products': ["Smart Watch", "Fitness Band"], 'context': 5},
+            {'products': [f"Product {i}" for i in range(6)]},
+            ["Smart Watch", "Fitness Band"],
+        )]
+
+    assert statuses == [400] * 6
+    assert stubs.CALLS['llm'] == calls
@@ -0,0 +1,80 @@
+from src.agents.cache import Cache
+from src.agents.disk_cache import DiskCache, TieredCache
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path).set("a", {"value": 1})
+
+    assert DiskCache(path).get("a") == {"value": 1}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", {"value": 1}, ttl_hours=-1)
+
+    assert cache.get("a") is None
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_stale_entries_kept_for_grace_window(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), stale_grace_hours=1)
+    cache.set("recent", {"value": 1}, ttl_hours=-0.5)
+    cache.set("old", {"value": 2}, ttl_hours=-2)
+    cache.cleanup_expired()
+
+    assert cache.get("recent") is None
+    value, expired_for = cache.get_stale("recent")
+    assert value == {"value": 1}
+    assert 1790 < expired_for < 1810
+    assert cache.get_stale("old") is None
+    assert cache.get_stats()['total_entries'] == 1
+
+
+def test_compaction_drops_least_recently_accessed(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=200, touch_seconds=0)
+    cache.set("old", {"text": "x" * 80})
+    cache.set("new", {"text": "y" * 80})
+    cache.get("new")
+    cache.set("newest", {"text": "z" * 80})
+
+    assert cache.get("old") is None
+    assert cache.get("newest") is not None
+    assert cache.get_stats()['total_bytes'] <= 200
+
+
+def test_recent_hits_skip_the_access_time_write(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path).set("a", {"value": 1})
+    recent, touching = DiskCache(path, touch_seconds=60), DiskCache(path, touch_seconds=0)
+
+    for cache, writes in ((recent, 0), (touching, 1)):
+        before = cache._connect().total_changes
+        assert cache.get("a") == {"value": 1}
+        assert cache._connect().total_changes - before == writes
+
+
+def test_compaction_runs_every_n_writes_or_past_estimated_size(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, max_bytes=400, compact_every=3)
+    compactions = []
+    compact = cache.compact
+    monkeypatch.setattr(cache, 'compact', lambda: compactions.append(1) or compact())
+
+    for i in range(5):
+        cache.set(f"k{i}", {"value": i})
+    assert len(compactions) == 1
+
+    # Another process fills the store; this one notices within compact_every writes
+    DiskCache(path).set("big", {"text": "x" * 500})
+    cache.set("k5", {"value": 5})
+    assert len(compactions) == 2 and cache.get_stats()['total_bytes'] <= 400
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"))
+    disk.set("a", {"value": 1})
+    cache = TieredCache(Cache(), disk)
+
+    assert cache.get("a") == {"value": 1}
+    assert cache.memory.get("a") == {"value": 1}
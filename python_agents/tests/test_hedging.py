@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agents.hedging import HedgePolicy, Hedger, LatencyTracker, hedge_policy
+
+
+def slow(seconds, value):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def failing():
+    raise RuntimeError("provider down")
+
+
+def test_slow_primary_is_hedged_to_secondary():
+    hedger = Hedger(max_workers=4)
+    policy = HedgePolicy(model="a", secondary="b", initial_delay=0.05)
+
+    start = time.perf_counter()
+    assert hedger.call("Hedge Test", policy, slow(1.0, "primary"), slow(0.01, "secondary")) == "secondary"
+    assert time.perf_counter() - start < 0.5
+    assert hedger.get_stats()["Hedge Test"]["secondary_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    hedger = Hedger(max_workers=4)
+    policy = HedgePolicy(model="a", secondary="b", initial_delay=1.0)
+
+    assert hedger.call("Fast Test", policy, slow(0.01, "primary"), slow(0.01, "secondary")) == "primary"
+    assert hedger.get_stats()["Fast Test"]["hedges"] == 0
+
+
+def test_primary_error_fails_over_immediately():
+    hedger = Hedger(max_workers=4)
+    policy = HedgePolicy(model="a", secondary="b", hedge=False)
+
+    assert hedger.call("Failover Test", policy, failing, slow(0, "secondary")) == "secondary"
+    assert hedger.get_stats()["Failover Test"]["failover_rate"] == 1.0
+
+
+def test_both_failing_raises():
+    hedger = Hedger(max_workers=4)
+    policy = HedgePolicy(model="a", secondary="b", initial_delay=0.01)
+
+    with pytest.raises(RuntimeError):
+        hedger.call("Broken Test", policy, failing, failing)
+
+
+def test_async_calls_follow_the_same_policy():
+    hedger = Hedger(max_workers=1)
+    cancelled = []
+
+    def answer(seconds, value, fail=False):
+        async def call():
+            try:
+                await asyncio.sleep(seconds)
+            except asyncio.CancelledError:
+                cancelled.append(value)
+                raise
+            if fail:
+                raise RuntimeError("provider down")
+            return value
+        return call
+
+    hedged = HedgePolicy(model="a", secondary="b", initial_delay=0.02)
+    failover = HedgePolicy(model="a", secondary="b", hedge=False)
+
+    assert asyncio.run(hedger.acall("Async Hedge Test", hedged, answer(1.0, "primary"), answer(0, "secondary"))) \
+        == "secondary"
+    assert cancelled == ["primary"]
+    assert hedger.get_stats()["Async Hedge Test"]["secondary_wins"] == 1
+    assert asyncio.run(hedger.acall("Async Failover Test", failover, answer(0, "primary", fail=True),
+                                    answer(0, "secondary"))) == "secondary"
+    assert hedger.get_stats()["Async Failover Test"]["failover_rate"] == 1.0
+
+
+def test_delay_follows_observed_percentile():
+    tracker = LatencyTracker(min_samples=3)
+    hedger = Hedger(tracker=tracker, max_workers=1)
+    policy = HedgePolicy(model="a", secondary="b", percentile=0.9, initial_delay=5.0, min_delay=0.1)
+    assert hedger.delay(policy) == 5.0
+
+    for seconds in (1.0, 2.0, 3.0):
+        tracker.observe("a", seconds)
+    assert hedger.delay(policy) == 3.0
+
+
+def test_policy_overrides_per_role(monkeypatch):
+    monkeypatch.setenv("LLM_SECONDARY_MODEL", "openai/gpt-4o-mini")
+    monkeypatch.setenv("LLM_HEDGE_POLICIES", '{"Industry Analyst": {"percentile": 0.5}}')
+
+    assert hedge_policy("Industry Analyst").percentile == 0.5
+    assert hedge_policy("Research Manager").hedge is False
+    assert hedge_policy("Market Research Analyst").enabled
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from src.agents.exceptions import QueueFullError
+from src.api.jobs import CANCELLED, COMPLETED, FAILED, JobQueue
+
+
+def wait_for(job, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.status != status and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.status == status
+
+
+def test_job_completes_with_result():
+    queue = JobQueue(max_workers=1, max_queue=1)
+    job = queue.submit(lambda x: {"value": x}, 1)
+
+    wait_for(job, COMPLETED)
+    assert queue.get(job.id).result == {"value": 1}
+    queue.shutdown()
+
+
+def test_failed_job_records_error():
+    queue = JobQueue(max_workers=1, max_queue=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    job = queue.submit(fail)
+    wait_for(job, FAILED)
+    assert job.error == "boom"
+    queue.shutdown()
+
+
+def test_full_queue_rejects_and_queued_jobs_cancel():
+    queue = JobQueue(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = queue.submit(release.wait, 5)
+    queued = queue.submit(lambda: "never")
+
+    with pytest.raises(QueueFullError):
+        queue.submit(lambda: "rejected")
+
+    queue.cancel(queued.id)
+    assert queued.status == CANCELLED
+    assert queue.get_stats()['pending'] == 1
+
+    release.set()
+    wait_for(running, COMPLETED)
+    queue.shutdown()
+
+
+
+def test_job_cancelled_as_worker_starts_releases_its_slot():
+    started, proceed = threading.Event(), threading.Event()
+
+    class GatedQueue(JobQueue):
+        def _run(self, *args):
+            # The worker holds the job but has not checked its status yet
+            started.set()
+            proceed.wait(5)
+            super()._run(*args)
+
+    queue = GatedQueue(max_workers=1, max_queue=0)
+    job = queue.submit(lambda: "discarded")
+    assert started.wait(5)
+    queue.cancel(job.id)
+    proceed.set()
+
+    deadline = time.monotonic() + 5
+    while queue.get_stats()['pending'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue.get_stats()['pending'] == 0
+    assert job.status == CANCELLED and job.result is None
+
+    next_job = queue.submit(lambda: "accepted")
+    wait_for(next_job, COMPLETED)
+    queue.shutdown()
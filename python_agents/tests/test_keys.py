@@ -0,0 +1,29 @@
+from src.agents.keys import KeyIndex, normalize_product, normalize_text
+
+
+def test_normalization_merges_spelling_variants():
+    assert normalize_product("Smart Watch") == normalize_product("smart watch ")
+    assert normalize_product("Smart Watch") == normalize_product("smartwatches")
+    assert normalize_text("Health & Fitness features!") == normalize_text("health fitness feature")
+    assert normalize_text("batteries") == "battery"
+
+
+def test_near_duplicate_lookup_and_stats():
+    index = KeyIndex(threshold=0.6)
+    index.add("smartwatch:us market focusing on health and fitness", "Smart Watch:US market")
+
+    assert index.find_similar("smartwatch:us market focusing on health and fitnes") is not None
+    assert index.find_similar("electric bicycle:europe") is None
+
+    index.record_lookup("smartwatch:x", "smartwatch:x", 'near_duplicate')
+    index.record_lookup("other:y", "other:y", 'miss')
+    stats = index.get_stats()
+    assert stats['hit_rate'] == 0.5
+    assert stats['hit_rate_without_near_duplicates'] == 0.0
+
+
+def test_disabled_threshold_never_matches():
+    index = KeyIndex(threshold=0)
+    index.add("smartwatch:us")
+
+    assert index.find_similar("smartwatch:us ") is None
@@ -0,0 +1,162 @@
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from stub_api import REPO_ROOT
+
+# llm_switch imports the shared hedging helper as python_agents.src.agents.hedging
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+_spec = importlib.util.spec_from_file_location("llm_switch", os.path.join(REPO_ROOT, "llm_switch.py"))
+llm_switch = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_switch)
+
+
+class StubProvider:
+    """Stands in for both provider SDK clients: per-prompt delays and failures."""
+
+    def __init__(self, name, delays=None, failures=()):
+        self.name = name
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.loops = set()
+        self.cancelled = 0
+
+    async def reply(self, prompt):
+        self.loops.add(asyncio.get_running_loop())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(prompt, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        if prompt in self.failures:
+            raise RuntimeError("rate limited")
+        return f"{self.name}: {prompt}"
+
+    async def create(self, model, messages, temperature, max_tokens):
+        text = await self.reply(messages[-1]['content'])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        return SimpleNamespace(text=await self.reply(prompt))
+
+
+def make_client(openai=None, gemini=None, max_concurrency=4, role="LLM Switch Test"):
+    client = llm_switch.LLMClient(max_concurrency=max_concurrency, role=role)
+    openai = openai or StubProvider("openai")
+    gemini = gemini or StubProvider("gemini")
+    client._openai_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=openai))
+    client._gemini_model = lambda name: gemini
+    return client
+
+
+def test_batch_results_keep_input_order_and_concurrency_limit():
+    prompts = [f"prompt {i}" for i in range(8)]
+    # Later prompts finish first
+    openai = StubProvider("openai", delays={prompt: 0.01 * (8 - i) for i, prompt in enumerate(prompts)})
+    client = make_client(openai, max_concurrency=3)
+
+    results = asyncio.run(client.agenerate_many(prompts))
+
+    assert [result.prompt for result in results] == prompts
+    assert [result.text for result in results] == [f"openai: {prompt}" for prompt in prompts]
+    assert all(result.ok and result.latency_ms > 0 for result in results)
+    assert openai.max_in_flight == 3
+
+
+def test_failed_prompt_is_reported_without_failing_the_batch():
+    client = make_client(StubProvider("openai", failures={"bad"}))
+
+    results = asyncio.run(client.agenerate_many(["good", "bad", "also good"]))
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert "gpt-3.5-turbo request failed: rate limited" in results[1].error
+    assert results[1].text is None
+    assert client.get_latency_stats()['openai']['errors'] == 1
+
+
+def test_agenerate_errors():
+    client = make_client(StubProvider("openai", failures={"bad"}))
+
+    with pytest.raises(llm_switch.LLMError):
+        asyncio.run(client.agenerate("bad"))
+    with pytest.raises(ValueError):
+        asyncio.run(client.agenerate("hi", model="gpt-5"))
+    with pytest.raises(ValueError):
+        asyncio.run(client.agenerate_many(["hi"], model="gpt-5"))
+    with pytest.raises(ValueError):
+        asyncio.run(client.agenerate_many(["hi", "there"], fallback="gpt-5"))
+    assert asyncio.run(client.agenerate("hi", model="gemini-pro")) == "gemini: hi"
+    assert client.generate_response("bad") is None
+
+
+def test_generate_many_from_sync_and_async_callers():
+    openai = StubProvider("openai")
+    client = make_client(openai)
+
+    sync_results = client.generate_many(["a", "b"])
+
+    async def caller():
+        return client.generate_many(["c", "d"]), asyncio.get_running_loop()
+
+    async_results, caller_loop = asyncio.run(caller())
+
+    assert [result.text for result in sync_results + async_results] == [f"openai: {p}" for p in "abcd"]
+    # Both ran on the client's one background loop, not the caller's
+    assert openai.loops == {client._loop} and caller_loop is not client._loop
+
+
+def test_primary_failure_fails_over_to_fallback():
+    client = make_client(StubProvider("openai", failures={"hi"}), role="LLM Switch Failover Test")
+
+    assert client.generate_response("hi", model="gpt-4", fallback="gemini-pro") == "gemini: hi"
+    assert client.get_hedge_stats()['failover_rate'] == 1.0
+    assert client.get_latency_stats()['openai']['errors'] == 1
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    openai = StubProvider("openai", delays={"hi": 1.0})
+    client = make_client(openai, role="LLM Switch Hedge Test")
+    client.hedge_policy.initial_delay = 0.02
+
+    start = time.perf_counter()
+    assert client.generate_response("hi", model="gpt-4", fallback="gemini-pro") == "gemini: hi"
+    assert time.perf_counter() - start < 0.5
+
+    deadline = time.time() + 1
+    while openai.cancelled == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert openai.cancelled == 1
+    assert client.get_hedge_stats()['hedges'] == 1
+    assert client.get_hedge_stats()['secondary_wins'] == 1
+
+
+def test_hedged_call_fails_only_when_both_models_fail():
+    client = make_client(StubProvider("openai", delays={"hi": 0.1}, failures={"hi"}),
+                         StubProvider("gemini", failures={"hi"}))
+    client.hedge_policy.initial_delay = 0.01
+
+    with pytest.raises(llm_switch.LLMError):
+        asyncio.run(client.agenerate("hi", model="gpt-4", fallback="gemini-pro"))
+
+
+def test_hedge_delay_tracks_model_latency():
+    client = make_client()
+    client.hedger.tracker.min_samples = 5
+    assert client.hedge_delay("gpt-4") == client.hedge_policy.initial_delay
+
+    for elapsed in (0.6, 0.7, 0.8, 0.9, 1.0):
+        client.hedger.tracker.observe("gpt-4", elapsed)
+    assert client.hedge_delay("gpt-4") == 1.0
+    assert client.hedge_delay("gemini-pro") == client.hedge_policy.initial_delay
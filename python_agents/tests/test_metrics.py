@@ -0,0 +1,29 @@
+from src.agents.metrics import Registry, span, trace
+
+
+def test_render_counter_and_histogram():
+    registry = Registry()
+    counter = registry.counter('requests_total', 'Requests', ('path',))
+    histogram = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1))
+    counter.inc(path='/analyze')
+    counter.inc(path='/analyze')
+    histogram.observe(0.5)
+
+    text = registry.render()
+    assert 'requests_total{path="/analyze"} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert 'latency_seconds_count 1' in text
+
+
+def test_trace_collects_spans():
+    with trace() as spans:
+        with span('kickoff', stage='market'):
+            pass
+
+    assert spans[0]['span'] == 'kickoff'
+    assert spans[0]['stage'] == 'market'
+    with span('outside'):
+        pass
+    assert len(spans) == 1
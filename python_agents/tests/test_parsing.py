@@ -0,0 +1,145 @@
+from src.agents.parsing import merge_charts, parse_structured_output
+from src.agents.values import normalize_chart, normalize_values
+
+
+SAMPLE = """# Report
+
+Intro text.
+
+[CHART_DATA type=pie title="Age Distribution"]
+- 18-24: 15%
+- 25-34: 30%
+- 35+: unknown
+[/CHART_DATA]
+
+Middle text.
+
+[TABLE_DATA title="Competitor Comparison"]
+| Competitor | Market Share |
+|------------|--------------|
+| Company A  | 35%          |
+| Broken row |
+| Company B  | 25%          |
+[/TABLE_DATA]
+
+Outro text.
+"""
+
+
+def test_extracts_charts_tables_and_content():
+    content, charts, tables = parse_structured_output(SAMPLE)
+
+    assert "CHART_DATA" not in content
+    assert "TABLE_DATA" not in content
+    assert "Middle text." in content and "Outro text." in content
+
+    assert charts[0]['data']['labels'] == ["18-24", "25-34"]
+    assert charts[0]['data']['datasets'][0]['data'] == [15.0, 30.0]
+
+    assert tables[0]['headers'] == ["Competitor", "Market Share"]
+    assert [row['Competitor'] for row in tables[0]['rows']] == ["Company A", "Company B"]
+
+
+def test_line_chart_with_currency_values():
+    text = '[CHART_DATA type=line title="Growth"]\nYears:\n- 2023: $150M\n- 2024 (projected): $1,200M\n[/CHART_DATA]'
+    _, charts, _ = parse_structured_output(text)
+
+    assert charts[0]['data']['labels'] == ["2023", "2024 (projected)"]
+    assert charts[0]['data']['datasets'][0]['data'] == [150.0, 1200.0]
+
+
+def test_merge_charts_aligns_labels_across_products():
+    def chart(title, text):
+        return parse_structured_output(f'[CHART_DATA type=line title="{title}"]\n{text}\n[/CHART_DATA]')[1]
+
+    merged = merge_charts({
+        "Smart Watch": chart("Smart Watch Market Growth", "- 2022: $100M\n- 2023: $150M"),
+        "Fitness Band": chart("Market Growth", "- 2023: $80M\n- 2024 (projected): $90M")
+        + chart("Price Range", "- Budget: 40%"),
+    })
+
+    assert [c['title'] for c in merged] == ["Market Growth", "Price Range"]
+    assert merged[0]['data']['labels'] == ["2022", "2023", "2024 (projected)"]
+    assert merged[0]['data']['datasets'] == [
+        {'label': "Smart Watch", 'data': [100.0, 150.0, None]},
+        {'label': "Fitness Band", 'data': [None, 80.0, 90.0], 'projected': [False, False, True]},
+    ]
+    assert merged[1]['data']['datasets'] == [{'label': "Fitness Band", 'data': [40.0]}]
+
+
+
+def test_merge_charts_keeps_other_units_apart():
+    def chart(text):
+        return parse_structured_output(f'[CHART_DATA type=bar title="Market Size"]\n{text}\n[/CHART_DATA]')[1]
+
+    merged = merge_charts({
+        "Alpha": chart("- 2023: $1.2B"),
+        "Beta": chart("- 2023: $900M"),
+        "Gamma": chart("- 2023: 40%"),
+        "Delta": chart("- 2023: €500M"),
+    })
+
+    assert [(c['unit']['type'], c['unit']['currency']) for c in merged] == \
+        [('currency', 'USD'), ('percent', None), ('currency', 'EUR')]
+    assert merged[0]['data']['datasets'] == [{'label': "Alpha", 'data': [1.2]}, {'label': "Beta", 'data': [0.9]}]
+    assert merged[1]['data']['datasets'] == [{'label': "Gamma", 'data': [40.0]}]
+    assert merged[2]['data']['datasets'] == [{'label': "Delta", 'data': [500.0]}]
+
+def test_values_with_suffixes_currencies_and_ranges():
+    text = ('[CHART_DATA type=bar title="Revenue"]\n- Alpha: $1.2B\n- Beta: $500K\n- Gamma: $150M\n'
+            '- Delta: $100M-$200M\n- Epsilon (projected): $250 million\n- Zeta: n/a\n[/CHART_DATA]')
+    _, charts, _ = parse_structured_output(text)
+    chart = charts[0]
+
+    assert chart['unit'] == {'type': 'currency', 'currency': 'USD', 'scale': 'M', 'multiplier': 1e6}
+    assert chart['data']['labels'] == ["Alpha", "Beta", "Gamma", "Delta", "Epsilon (projected)"]
+    dataset = chart['data']['datasets'][0]
+    assert dataset['data'] == [1200.0, 0.5, 150.0, 150.0, 250.0]
+    assert dataset['ranges'] == [None, None, None, [100.0, 200.0], None]
+    assert dataset['projected'] == [False, False, False, False, True]
+
+
+def test_percent_ranges_and_large_charts():
+    body = "\n".join(f"- Segment {i}: {i % 50}-{i % 50 + 10}%" for i in range(500))
+    _, charts, _ = parse_structured_output(f'[CHART_DATA type=bar title="Share"]\n{body}\n[/CHART_DATA]')
+    dataset = charts[0]['data']['datasets'][0]
+
+    assert charts[0]['unit']['type'] == 'percent'
+    assert len(dataset['data']) == 500
+    assert dataset['data'][3] == 8.0 and dataset['ranges'][3] == [3.0, 13.0]
+
+
+def test_large_charts_scale_like_small_ones():
+    items = ["$1.2B", "$500K", "$150M", "-$5M", "$100M-$1.2B", "75"]
+    small = normalize_chart("".join(f"- Item {i}: {value}\n" for i, value in enumerate(items)))
+    large = normalize_chart("".join(f"- Item {i}: {items[i % len(items)]}\n"
+                                    for i in range(600)))
+
+    assert small['data'] == [1200.0, 0.5, 150.0, -5.0, 650.0, 75.0]
+    assert small['ranges'][4] == [100.0, 1200.0]
+    assert large['unit'] == small['unit']
+    assert large['data'][:len(items)] == small['data']
+    assert large['ranges'][:len(items)] == small['ranges']
+
+
+def test_negative_ranges_keep_both_signs():
+    percent = normalize_values(["-5% to -3%", "-2–4%"])
+    currency = normalize_values(["-$5M to -$3M"])
+
+    assert percent['ranges'] == [[-5.0, -3.0], [-2.0, 4.0]]
+    assert percent['data'] == [-4.0, 1.0]
+    assert currency['ranges'] == [[-5.0, -3.0]] and currency['unit']['scale'] == 'M'
+
+
+def test_values_in_another_unit_are_not_plotted():
+    text = ('[CHART_DATA type=bar title="Share"]\n- Alpha: 45%\n- Beta: $50M\n- Gamma: 30%\n[/CHART_DATA]\n'
+            '[CHART_DATA type=bar title="Revenue"]\n- Alpha: $10M\n- Beta: 5%\n- Gamma: €20M\n- Delta: 15M\n'
+            '[/CHART_DATA]')
+    _, (share, revenue), _ = parse_structured_output(text)
+
+    assert share['unit']['type'] == 'percent'
+    assert share['data']['datasets'][0]['data'] == [45.0, None, 30.0]
+    assert share['data']['datasets'][0]['mismatched'] == [False, True, False]
+    assert revenue['unit']['currency'] == 'USD'
+    assert revenue['data']['datasets'][0]['data'] == [10.0, None, None, 15.0]
+    assert normalize_values(["45%", "$50M"])['data'] == [45.0, None]
@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from src.agents.rate_limit import AdaptiveLimiter, FileTokenBucket, TokenBucket, is_throttled
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+def test_token_bucket_spaces_reservations_after_burst():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now = 10.0
+    assert bucket.reserve() == 0.0
+
+    bucket.pause(3)
+    assert bucket.reserve() == 3.0
+
+
+def test_file_bucket_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "serper.bucket")
+    first = FileTokenBucket(path, rate=1, burst=1)
+    second = FileTokenBucket(path, rate=1, burst=1)
+
+    assert first.reserve() == 0.0
+    assert second.reserve() > 0.5
+
+
+def test_aimd_halves_on_throttle_and_grows_on_success():
+    limiter = AdaptiveLimiter("test", max_concurrency=8, max_retries=0, backoff=0)
+    assert limiter.limit == 4
+
+    with pytest.raises(Throttled):
+        limiter.call(lambda: (_ for _ in ()).throw(Throttled()))
+    assert limiter.limit == 2
+
+    for _ in range(10):
+        limiter.call(lambda: None)
+    assert 2 < limiter.limit <= 8
+    assert limiter.get_stats()['throttled'] == 1
+
+
+def test_throttled_call_is_retried():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Throttled()
+        return "ok"
+
+    limiter = AdaptiveLimiter("retry", max_retries=3, backoff=0.01)
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_concurrency_never_exceeds_limit():
+    limiter = AdaptiveLimiter("bounded", max_concurrency=2)
+    limiter.limit = 2
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(0.05)
+        with lock:
+            active[0] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] <= 2
+
+
+def test_is_throttled_recognizes_provider_errors():
+    assert is_throttled(Throttled())
+    assert is_throttled(Exception("429 RESOURCE_EXHAUSTED: quota"))
+    assert not is_throttled(ValueError("bad input"))
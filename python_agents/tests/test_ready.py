@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from benchmarks import stubs
+
+stubs.install(llm_latency=0, search_latency=0)
+
+from stub_api import load_api
+
+
+def test_ready_after_blocking_warmup(monkeypatch):
+    api = load_api(monkeypatch, POOL_WARMUP="blocking")
+    with TestClient(api.app) as client:
+        response = client.get("/ready")
+
+    assert response.status_code == 200 and response.json()['status'] == 'ready'
+
+
+def test_lazy_pool_is_ready_before_first_analysis(monkeypatch):
+    api = load_api(monkeypatch, POOL_WARMUP="lazy")
+    with TestClient(api.app) as client:
+        before = client.get("/ready")
+        assert client.post("/analyze", json={'product_name': "Smart Watch", 'context': ""}).status_code == 200
+        after = client.get("/ready")
+
+    assert before.status_code == 200 and before.json()['status'] == 'lazy'
+    assert before.json()['pool']['ready'] is False
+    assert after.status_code == 200 and after.json()['status'] == 'ready'
+
+
+def test_unwarmed_pool_is_not_ready(monkeypatch):
+    api = load_api(monkeypatch, POOL_WARMUP="background")
+    # Stands in for a background warm-up that has not finished
+    monkeypatch.setattr(api, 'warm_pool', lambda: None)
+    with TestClient(api.app) as client:
+        response = client.get("/ready")
+
+    assert response.status_code == 503 and response.json()['status'] == 'warming'
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from src.agents.cache import Cache
+from src.agents.keys import analysis_key
+from src.agents.pool import ManagerPool
+from src.agents.refresh import RefreshScheduler
+from src.agents.report_store import ReportStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(clock, cache, calls, **kwargs):
+    done = threading.Event()
+
+    def refresh(product_name, context):
+        calls.append(product_name)
+        cache.set(analysis_key(product_name, context), {'report': 'fresh'})
+        done.set()
+
+    options = dict(top_n=2, window_hours=1, max_concurrency=1, budget_per_hour=10,
+                   interval_seconds=60, half_life_hours=24, clock=clock)
+    options.update(kwargs)
+    return RefreshScheduler(cache, refresh, **options), done
+
+
+def test_hottest_ranks_by_decayed_access_count():
+    clock = Clock()
+    scheduler, _ = make_scheduler(clock, Cache(clock=clock), [])
+    for _ in range(3):
+        scheduler.record_access("Smart Watch")
+    scheduler.record_access("Tablet")
+    scheduler.record_access("smartwatches")
+
+    ranked = scheduler.hottest()
+    assert [key for key, *_ in ranked] == [analysis_key("Smart Watch"), analysis_key("Tablet")]
+    assert ranked[0][1] == 4
+
+
+def test_only_hot_keys_near_expiry_are_refreshed():
+    clock = Clock()
+    cache = Cache(ttl_hours=2, clock=clock)
+    calls = []
+    scheduler, done = make_scheduler(clock, cache, calls)
+    cache.set(analysis_key("Smart Watch"), {'report': 'old'})
+    scheduler.record_access("Smart Watch")
+
+    assert scheduler.tick() == []
+
+    clock.now = 1.5 * 3600
+    assert scheduler.tick() == [analysis_key("Smart Watch")]
+    assert done.wait(1)
+    assert calls == ["Smart Watch"]
+    assert cache.get(analysis_key("Smart Watch")) == {'report': 'fresh'}
+    scheduler.stop()
+
+
+def test_budget_caps_refreshes_per_hour():
+    clock = Clock()
+    cache = Cache(ttl_hours=0.5, clock=clock)
+    scheduler, done = make_scheduler(clock, cache, [], budget_per_hour=1, max_concurrency=2)
+    for product in ("A", "B"):
+        cache.set(analysis_key(product), {'report': 'old'})
+        scheduler.record_access(product)
+
+    assert len(scheduler.tick()) == 1
+    assert scheduler.get_stats()['skipped_over_budget'] == 1
+    scheduler.stop()
+
+
+def test_stale_report_served_while_one_revalidation_runs():
+    clock = Clock()
+    cache = Cache(ttl_hours=1, stale_grace_hours=1, clock=clock)
+    key = analysis_key("Smart Watch")
+    cache.set(key, {'metadata': {'timestamp': '2024-01-01T00:00:00', 'status': 'success'}, 'report': 'old'})
+    clock.now = 3600 + 120
+
+    pool = ManagerPool(size=1, cache=cache, report_store=ReportStore())
+    release = threading.Event()
+    calls = []
+
+    def refresh(product_name, context=""):
+        calls.append(product_name)
+        release.wait(5)
+        cache.set(key, {'metadata': {'status': 'success'}, 'report': 'fresh'})
+
+    pool.refresh = refresh
+    first = pool.analyze("Smart Watch")
+    second = pool.analyze("smart watches")
+    release.set()
+
+    assert first['report'] == second['report'] == 'old'
+    assert first['metadata']['stale'] is True
+    assert first['metadata']['expired_seconds'] == 120
+    assert first['metadata']['age_seconds'] > 0
+    for _ in range(100):
+        if not pool.get_stats()['revalidating']:
+            break
+        time.sleep(0.01)
+    assert calls == ["Smart Watch"]
+    assert pool.get_cached("Smart Watch") == {'metadata': {'status': 'success'}, 'report': 'fresh'}
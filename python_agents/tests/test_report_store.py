@@ -0,0 +1,72 @@
+from src.agents.report_store import ReportStore, create_report_store, match_query
+
+
+def make_report(manager, market="", status='success'):
+    return {
+        'metadata': {'timestamp': '2024-05-01T12:00:00', 'status': status},
+        'results': {'manager': manager, 'market': market, 'consumer': None, 'industry': {'content': ""}},
+        'errors': {}
+    }
+
+
+def test_search_ranks_product_matches_first(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.sqlite3"))
+    store.add("smart watch", "Smart Watch", "", make_report("Wearables keep growing."))
+    store.add("fitness band", "Fitness Band", "", make_report("Competes with every smart watch brand."))
+    for product in ("Coffee Maker", "Desk Lamp", "Office Chair"):
+        store.add(product.lower(), product, "", make_report("Home and office goods."))
+
+    page = store.search("smart watches")
+    assert page['total'] == 2
+    assert [result['product_name'] for result in page['results']] == ["Smart Watch", "Fitness Band"]
+    assert page['results'][0]['score'] > page['results'][1]['score']
+    assert '[' in page['results'][1]['snippet']
+
+
+def test_search_paginates_and_lists_recent_without_query():
+    store = ReportStore()
+    ids = [store.add(f"product {i}", f"Product {i}", "", make_report("Battery life report")) for i in range(5)]
+
+    first = store.search("battery", limit=2)
+    last = store.search("battery", limit=2, offset=4)
+    assert first['total'] == 5 and first['next_offset'] == 2
+    assert len(last['results']) == 1 and last['next_offset'] is None
+    assert [result['id'] for result in store.search(limit=2)['results']] == ids[::-1][:2]
+
+
+def test_get_returns_full_report():
+    store = ReportStore()
+    report_id = store.add("widget", "Widget", "b2b", make_report("Summary", status='partial_success'))
+
+    stored = store.get(report_id)
+    assert stored['product_name'] == "Widget" and stored['context'] == "b2b"
+    assert stored['status'] == 'partial_success'
+    assert stored['report']['results']['manager'] == "Summary"
+    assert store.get(report_id + 1) is None
+
+
+def test_query_syntax_is_escaped():
+    assert match_query('smart "watch" OR -') == '"smart" "watch" "OR"'
+    assert ReportStore().search('"unbalanced AND (')['total'] == 0
+
+
+def test_history_keeps_newest_reports_per_key():
+    store = ReportStore(max_per_key=2)
+    ids = [store.add("widget", "Widget", "", make_report(f"Refresh {i} battery")) for i in range(4)]
+    other = store.add("gadget", "Gadget", "", make_report("Battery"))
+
+    assert store.get_stats()['reports'] == 3
+    assert store.get(ids[1]) is None and store.get(ids[2]) is not None
+    assert {result['id'] for result in store.search("battery")['results']} == {ids[2], ids[3], other}
+
+
+def test_default_store_persists_under_data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("REPORT_DB_PATH", raising=False)
+    store = create_report_store()
+    # Nothing is created until the store is first used
+    assert not (tmp_path / "data").exists()
+    report_id = store.add("widget", "Widget", "", make_report("Summary"))
+
+    assert (tmp_path / "data" / "reports.sqlite3").exists()
+    assert create_report_store().get(report_id)['product_name'] == "Widget"
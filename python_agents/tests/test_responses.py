@@ -0,0 +1,57 @@
+import gzip
+import json
+
+from starlette.requests import Request
+
+from src.api.responses import dumps, etag_matches, negotiate_encoding, report_response
+
+REPORT = {'results': {'manager': {'content': "Market overview. " * 200}}, 'errors': {}}
+
+
+def make_request(method='GET', **headers):
+    return Request({
+        'type': 'http',
+        'method': method,
+        'path': '/analyze',
+        'headers': [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+def test_dumps_is_compact_json():
+    assert json.loads(dumps(REPORT)) == REPORT
+    assert b', ' not in dumps({'a': 1, 'b': [1, 2]})
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == 'gzip'
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding(None) is None
+
+
+def test_report_response_is_compressed_with_stable_etag():
+    first = report_response(make_request(accept_encoding="gzip"), REPORT)
+    second = report_response(make_request(), REPORT)
+
+    assert first.headers['etag'] == second.headers['etag']
+    assert first.headers['content-encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(first.body)) == REPORT
+    assert 'content-encoding' not in second.headers
+
+
+def test_matching_if_none_match_returns_304():
+    etag = report_response(make_request(), REPORT).headers['etag']
+
+    response = report_response(make_request(if_none_match=etag), REPORT)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert etag_matches(f'"other", {etag[2:]}', etag)
+    assert report_response(make_request(if_none_match='"stale"'), REPORT).status_code == 200
+
+
+def test_post_with_matching_etag_gets_full_body():
+    etag = report_response(make_request(), REPORT).headers['etag']
+
+    assert report_response(make_request('HEAD', if_none_match=etag), REPORT).status_code == 304
+    response = report_response(make_request('POST', if_none_match=etag), REPORT)
+    assert response.status_code == 200
+    assert json.loads(response.body) == REPORT
@@ -0,0 +1,33 @@
+from src.agents.search_cache import SearchCache
+
+
+def test_normalized_queries_share_an_entry():
+    cache = SearchCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"organic": ["result"]}
+
+    cache.search("Smart Watch market size", fetch)
+    cache.search("  smart   watch MARKET size? ", fetch)
+
+    assert len(calls) == 1
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['fetches'] == 1
+    assert 'latency_ms' in stats
+
+
+def test_parameters_are_part_of_the_key():
+    cache = SearchCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"organic": []}
+
+    cache.search("smart watch", fetch, n_results=5)
+    cache.search("smart watch", fetch, n_results=10)
+
+    assert len(calls) == 2
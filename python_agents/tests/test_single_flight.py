@@ -0,0 +1,37 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agents.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 1}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", compute) for _ in range(4)]
+        while flight.get_stats()['coalesced'] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == {"value": 1} for result, _ in results)
+    assert sum(shared for _, shared in results) == 3
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight()
+    flight.do("key", lambda: 1)
+    result, shared = flight.do("key", lambda: 2)
+
+    assert result == 2
+    assert shared is False
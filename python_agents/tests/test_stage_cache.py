@@ -0,0 +1,117 @@
+from string import Formatter
+
+from benchmarks import stubs
+
+stubs.install(llm_latency=0, search_latency=0)
+
+from src.agents.cache import Cache
+from src.agents.pool import ManagerPool
+from src.agents.report_store import ReportStore
+from src.agents.research_manager import ANALYST_STAGES, STAGE_CACHE_POLICY, ResearchManager
+
+
+def test_stage_inputs_cover_prompt_placeholders():
+    for stage, (_, description, _) in ANALYST_STAGES.items():
+        placeholders = {name for _, name, _, _ in Formatter().parse(description) if name}
+        assert placeholders <= set(STAGE_CACHE_POLICY[stage]['inputs']), stage
+
+
+
+def test_stage_prompts_ask_for_chart_and_table_markers(monkeypatch):
+    prompts = []
+    call = stubs.LLM.call
+
+    def record(self, messages, *args, **kwargs):
+        prompts.append(messages[-1]['content'])
+        return call(self, messages, *args, **kwargs)
+
+    monkeypatch.setattr(stubs.LLM, 'call', record)
+    manager = ResearchManager(cache=Cache())
+    for stage, (analyst_attr, _, _) in ANALYST_STAGES.items():
+        prompts.clear()
+        manager.run_stage(stage, "Smart Watch", "fitness")
+        (prompt,) = prompts
+        assert "[CHART_DATA type=" in prompt and "[TABLE_DATA title=" in prompt, stage
+        assert getattr(manager, analyst_attr).output_format.split("[CHART_DATA")[1].split("]")[0] in prompt
+        assert ("fitness" in prompt) == (stage != 'industry')
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def llm_calls(action):
+    before = stubs.CALLS['llm']
+    result = action()
+    return result, stubs.CALLS['llm'] - before
+
+
+def test_stage_keys_use_only_declared_inputs():
+    key = ResearchManager.stage_cache_key
+    outputs = {stage: f"{stage} report" for stage in ANALYST_STAGES}
+
+    assert key('industry', product_name="Smart Watch", context="fitness") == \
+        key('industry', product_name="smart watches", context="enterprise")
+    assert key('market', product_name="Smart Watch", context="fitness") != \
+        key('market', product_name="Smart Watch", context="enterprise")
+    assert key('market', product_name="Smart Watch", context="Fitness ") == \
+        key('market', product_name="Smart Watch", context="fitness")
+    assert key('manager', product_name="Smart Watch", context="fitness", **outputs) != \
+        key('manager', product_name="Smart Watch", context="fitness", **dict(outputs, industry="changed"))
+
+
+def test_context_change_reuses_context_independent_stages():
+    manager = ResearchManager(cache=Cache())
+    manager.analyze_task("Smart Watch", "fitness tracking for runners")
+    response, calls = llm_calls(lambda: manager.analyze_task("Smart Watch", "enterprise procurement in hospitals"))
+
+    assert response['metadata']['reused_stages'] == ['industry']
+    # Market and consumer analysts re-run, and so does synthesis since their outputs changed
+    assert calls == 3
+
+
+def test_synthesis_reused_only_when_every_upstream_output_is_unchanged():
+    manager = ResearchManager(cache=Cache())
+    outputs = {stage: stubs.stub_report(stage) for stage in ANALYST_STAGES}
+    first, calls = llm_calls(lambda: manager.run_synthesis("Smart Watch", "fitness", outputs))
+    assert calls == 1 and first[2] is False
+
+    again, calls = llm_calls(lambda: manager.run_synthesis("Smart Watch", "fitness", dict(outputs)))
+    assert calls == 0 and again == (first[0], None, True)
+
+    for stage in ANALYST_STAGES:
+        changed = dict(outputs, **{stage: stubs.stub_report(f"{stage} revised")})
+        rerun, calls = llm_calls(lambda: manager.run_synthesis("Smart Watch", "fitness", changed))
+        assert calls == 1 and rerun[2] is False, stage
+
+
+def test_reuse_false_reruns_every_stage():
+    manager = ResearchManager(cache=Cache())
+    manager.run_analysts("Smart Watch", "fitness")
+    (_, _, reused), calls = llm_calls(lambda: manager.run_analysts("Smart Watch", "fitness"))
+    assert sorted(reused) == sorted(ANALYST_STAGES) and calls == 0
+
+    (results, errors, reused), calls = llm_calls(lambda: manager.run_analysts("Smart Watch", "fitness", reuse=False))
+    assert reused == [] and errors == {} and calls == len(ANALYST_STAGES)
+    assert set(results) == set(ANALYST_STAGES)
+
+    response, calls = llm_calls(lambda: manager.analyze_task("Smart Watch", "fitness", refresh=True))
+    assert response['metadata']['reused_stages'] == [] and calls == len(ANALYST_STAGES) + 1
+
+
+def test_refresh_reruns_only_expiring_stages():
+    clock = Clock()
+    pool = ManagerPool(size=1, cache=Cache(clock=clock), report_store=ReportStore())
+    pool.refresher.window = 2 * 3600
+    pool.analyze("Smart Watch", "fitness")
+    # An hour before the 24h stages expire; industry is cached for 72h
+    clock.now = 23 * 3600
+
+    response, calls = llm_calls(lambda: pool.refresh("Smart Watch", "fitness"))
+
+    assert response['metadata']['reused_stages'] == ['industry']
+    # Market and consumer analysts, then synthesis, whose cached entry is expiring too
+    assert calls == 3
@@ -0,0 +1,67 @@
+import importlib
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks import stubs
+
+stubs.install(llm_latency=0, search_latency=0)
+
+from src.agents.cache import Cache
+from src.agents.research_manager import ANALYST_STAGES, ResearchManager
+from stub_api import load_api, read_events
+
+
+def test_stream_runs_every_stage_on_cache_miss():
+    manager = ResearchManager(cache=Cache())
+    events = list(manager.analyze_stream("Smart Watch", "fitness"))
+
+    assert sorted(event['stage'] for event in events[:3]) == sorted(ANALYST_STAGES)
+    assert [event['stage'] for event in events[3:]] == ['manager', 'complete']
+    assert all(event['status'] == 'success' for event in events)
+    assert events[-1]['response']['metadata']['status'] == 'success'
+
+
+def stream(client, product_name, context=""):
+    response = client.post("/analyze/stream", json={'product_name': product_name, 'context': context})
+    assert response.status_code == 200
+    return read_events(response.text)
+
+
+def test_api_streams_analysts_in_completion_order(monkeypatch):
+    api = load_api(monkeypatch)
+    research_manager = importlib.import_module('python_agents.src.agents.research_manager')
+    run_stage = research_manager.ResearchManager.run_stage
+    delays = {'market': 0.2, 'consumer': 0.1, 'industry': 0.0}
+
+    def delayed(self, stage, product_name, context=""):
+        time.sleep(delays[stage])
+        return run_stage(self, stage, product_name, context)
+
+    monkeypatch.setattr(research_manager.ResearchManager, 'run_stage', delayed)
+    with TestClient(api.app) as client:
+        events = stream(client, "Smart Watch")
+
+    assert [name for name, _ in events] == ['industry', 'consumer', 'market', 'manager', 'complete']
+    for name, event in events[:4]:
+        assert event['stage'] == name and event['status'] == 'success'
+        assert event['content'] and event['charts']
+    response = events[-1][1]['response']
+    assert response['metadata']['reused_stages'] == []
+    assert set(response['results']) == {'manager', *ANALYST_STAGES}
+
+
+def test_api_stream_replays_cached_report(monkeypatch):
+    api = load_api(monkeypatch)
+    with TestClient(api.app) as client:
+        first = stream(client, "Smart Watch", "fitness")
+        calls = stubs.CALLS['llm']
+        replay = stream(client, "smart watches", "Fitness")
+
+    assert stubs.CALLS['llm'] == calls
+    assert [name for name, _ in replay] == [*ANALYST_STAGES, 'manager', 'complete']
+    assert replay[-1][1]['response'] == first[-1][1]['response']
+    streamed = dict(first[:4])
+    for name, event in replay[:4]:
+        assert event['content'] == streamed[name]['content']
+        assert event['charts'] == streamed[name]['charts']
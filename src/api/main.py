@@ -1,13 +1,75 @@
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from python_agents.src.agents.research_manager import ResearchManager
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from python_agents.src.agents.exceptions import AgentError, QueueFullError, StoreError, ValidationError
+from python_agents.src.agents import metrics
+from python_agents.src.agents.pool import ManagerPool
+from python_agents.src.agents.search_cache import search_cache
+from python_agents.src.agents.hedging import hedger
+from python_agents.src.agents import rate_limit
+from python_agents.src.api.jobs import JobQueue
+from python_agents.src.api.responses import CompactJSONResponse, report_response
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 import json
+import os
+import threading
+import time
 from datetime import datetime
+from typing import List
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+manager_pool = ManagerPool()
+job_queue = JobQueue()
+
+
+def warm_pool() -> None:
+    """Warm the manager pool, logging rather than raising on failure."""
+    try:
+        manager_pool.warm()
+    except Exception as e:
+        # Keep serving so /ready can report the failure; checkout retries warming
+        logger.error(f"Research manager pool failed to warm: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the research manager pool according to POOL_WARMUP, and start
+    the refresh-ahead scheduler when REFRESH_AHEAD is set.
+
+    'blocking' (default) warms before accepting traffic, 'background' starts
+    serving at once and warms on a daemon thread (/ready reports 503 until
+    done), and 'lazy' builds managers on the first analysis (/ready reports
+    'lazy' with 200 meanwhile).
+    """
+    mode = os.getenv("POOL_WARMUP", "blocking")
+    if mode == "blocking":
+        await asyncio.to_thread(warm_pool)
+    elif mode == "background":
+        threading.Thread(target=warm_pool, name="pool-warmup", daemon=True).start()
+    refresh_ahead = os.getenv("REFRESH_AHEAD", "").lower() in ('1', 'true', 'yes')
+    if refresh_ahead:
+        manager_pool.refresher.start()
+    yield
+    if refresh_ahead:
+        manager_pool.refresher.stop()
+    job_queue.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=CompactJSONResponse)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them by route template."""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    path = route.path if route is not None else 'unmatched'
+    metrics.HTTP_REQUESTS.inc(method=request.method, path=path, status=response.status_code)
+    metrics.HTTP_DURATION.observe(time.perf_counter() - start, method=request.method, path=path)
+    return response
 
 def extract_analysis_request(body: dict) -> dict:
     """
@@ -32,6 +94,123 @@ def extract_analysis_request(body: dict) -> dict:
     }
 
 
+def format_analysis_response(analysis_results) -> dict:
+    """Wrap analysis output in the standard response format if it is not already."""
+    if isinstance(analysis_results, dict) and 'results' in analysis_results:
+        return analysis_results
+    # If we get an unstructured response, wrap it in our standard format; the
+    # text is the whole report, so it is not repeated under every analyst
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'version': '2.0',
+            'status': 'success'
+        },
+        'results': {
+            'manager': analysis_results,
+            'market': None,
+            'consumer': None,
+            'industry': None
+        },
+        'errors': {}
+    }
+
+
+def error_response(message: str, status_code: int) -> CompactJSONResponse:
+    """Standard-format error response."""
+    return CompactJSONResponse(content={
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'version': '2.0',
+            'status': 'error'
+        },
+        'results': {
+            'manager': {},
+            'market': {},
+            'consumer': {},
+            'industry': {}
+        },
+        'errors': {
+            "system_error": message
+        }
+    }, status_code=status_code)
+
+
+def run_analysis(product_name: str, context: str, include_timings: bool = False) -> dict:
+    """Run an analysis on the manager pool and return the standard response.
+
+    With include_timings, the spans recorded while serving this request are
+    added to the response metadata.
+    """
+    with metrics.trace() as spans:
+        response = format_analysis_response(manager_pool.analyze(product_name, context))
+    if not include_timings:
+        return response
+    # Cached and coalesced responses are shared, so annotate a copy
+    response = dict(response)
+    response['metadata'] = dict(response['metadata'], timings=spans)
+    return response
+
+
+@app.get("/health")
+async def health():
+    """Liveness check."""
+    return {
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'pool': manager_pool.get_stats(),
+        'llm': hedger.get_stats(),
+        'rate_limits': rate_limit.get_stats()
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness check: succeeds once the research manager pool is warm.
+
+    With POOL_WARMUP=lazy the pool only warms on the first analysis, which
+    a load balancer would never send to an unready pod, so the check
+    succeeds at once with status 'lazy'.
+    """
+    stats = manager_pool.get_stats()
+    if stats['ready']:
+        status = 'ready'
+    elif os.getenv("POOL_WARMUP", "blocking") == "lazy":
+        status = 'lazy'
+    else:
+        status = 'warming'
+    return CompactJSONResponse(content={
+        'status': status,
+        'timestamp': datetime.now().isoformat(),
+        'pool': stats
+    }, status_code=503 if status == 'warming' else 200)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Pipeline latency histograms and counters in Prometheus text format."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss, eviction and size counters for the result and search caches."""
+    stats = manager_pool.cache.get_stats()
+    stats['search'] = search_cache.get_stats()
+    stats['keys'] = manager_pool.key_index.get_stats()
+    stats['refresh'] = manager_pool.refresher.get_stats()
+    stats['reports'] = manager_pool.reports.get_stats()
+    return stats
+
+
+@app.post("/cache/clear")
+async def cache_clear():
+    """Drop every cached analysis."""
+    manager_pool.cache.clear()
+    search_cache.clear()
+    return {'status': 'success', 'message': 'Cache cleared'}
+
+
 @app.post("/analyze")
 async def analyze(request: Request):
     """
@@ -48,62 +227,233 @@ async def analyze(request: Request):
         if not product_name:
               raise HTTPException(status_code=400, detail="Product name is required")
       
-        research_manager = ResearchManager()
-        analysis_results = research_manager.analyze_task(product_name, context)
-        
-        # Ensure we have a properly structured response
-        if isinstance(analysis_results, dict) and 'results' in analysis_results:
-            return JSONResponse(content=analysis_results)
-        else:
-            # If we get an unstructured response, wrap it in our standard format
-            return JSONResponse(content={
-                'metadata': {
-                    'timestamp': datetime.now().isoformat(),
-                    'version': '2.0',
-                    'status': 'success'
-                },
-                'results': {
-                    'manager': analysis_results,
-                    'market': analysis_results,
-                    'consumer': analysis_results,
-                    'industry': analysis_results
-                },
-                'errors': {}
-            })
-    
+        try:
+            # Run off the event loop so concurrent identical requests can coalesce
+            include_timings = request.query_params.get('timings', '').lower() in ('1', 'true', 'yes')
+            analysis_results = await asyncio.to_thread(run_analysis, product_name, context, include_timings)
+        except AgentError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        return report_response(request, analysis_results)
+
     except HTTPException as http_ex:
-      logger.error(f"HTTP error: {str(http_ex)}")
-      return JSONResponse(content={
-        'metadata': {
-          'timestamp': datetime.now().isoformat(),
-          'version': '2.0',
-          'status': 'error'
-        },
-        'results': {
-          'manager': {},
-          'market': {},
-          'consumer': {},
-          'industry': {}
-        },
-        'errors': {
-              "system_error": str(http_ex.detail)
-        }
-      }, status_code=http_ex.status_code)
+        logger.error(f"HTTP error: {str(http_ex)}")
+        return error_response(str(http_ex.detail), http_ex.status_code)
     except Exception as e:
-         logger.error(f"Unexpected error: {str(e)}")
-         return JSONResponse(content={
-          'metadata': {
-            'timestamp': datetime.now().isoformat(),
-            'version': '2.0',
-            'status': 'error'
-          },
-          'results': {
-             'manager': {},
-              'market': {},
-              'consumer': {},
-              'industry': {}
-          },
-          'errors': {
-              "system_error": str(e)
-          }
-        }, status_code=500)
\ No newline at end of file
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response(str(e), 500)
+
+
+@app.get("/analyze")
+async def get_report(request: Request, product_name: str = "", context: str = ""):
+    """
+    Return a previously computed report without running the analysis. The
+    response carries an ETag; a matching If-None-Match gets 304 Not Modified.
+    """
+    if not product_name:
+        return error_response("Product name is required", 400)
+    report = await asyncio.to_thread(manager_pool.get_cached, product_name, context)
+    if report is None:
+        return error_response("No report has been computed for this request", 404)
+    return report_response(request, format_analysis_response(report))
+
+
+async def read_analysis_request(request: Request) -> dict:
+    """Parse and validate an analysis request body."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    analysis_request = extract_analysis_request(body)
+    if not analysis_request.get('product_name'):
+        raise HTTPException(status_code=400, detail="Product name is required")
+    return analysis_request
+
+
+def stream_analysis_events(product_name: str, context: str):
+    """Format per-stage analysis events as Server-Sent Events."""
+    try:
+        for event in manager_pool.analyze_stream(product_name, context):
+            yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+    except Exception as e:
+        logger.error(f"Error streaming analysis: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'stage': 'error', 'status': 'error', 'error': str(e)})}\n\n"
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(request: Request):
+    """Stream each analyst section as it completes, then the synthesis, as Server-Sent Events."""
+    try:
+        analysis_request = await read_analysis_request(request)
+    except HTTPException as http_ex:
+        logger.error(f"HTTP error: {str(http_ex)}")
+        return error_response(str(http_ex.detail), http_ex.status_code)
+    # Starlette iterates sync generators in its threadpool, off the event loop
+    return StreamingResponse(
+        stream_analysis_events(analysis_request['product_name'], analysis_request['context']),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def read_batch_items(body) -> List[dict]:
+    """Validate a batch body: a list of analysis requests, bare or under 'items'."""
+    items = body.get('items') if isinstance(body, dict) else body
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="Batch requires a non-empty 'items' list")
+    max_items = int(os.getenv("BATCH_MAX_ITEMS", 50))
+    if len(items) > max_items:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {max_items} items")
+    analysis_requests = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=400, detail=f"Item {index} must be an object")
+        analysis_request = extract_analysis_request(item)
+        if not analysis_request.get('product_name'):
+            raise HTTPException(status_code=400, detail=f"Item {index}: product name is required")
+        analysis_requests.append(analysis_request)
+    return analysis_requests
+
+
+def stream_batch_events(items: List[dict]):
+    """Format batch item completions and the final summary as Server-Sent Events."""
+    try:
+        for event in manager_pool.analyze_batch(items):
+            yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+    except Exception as e:
+        logger.error(f"Error streaming batch: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'stage': 'error', 'status': 'error', 'error': str(e)})}\n\n"
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """Analyze a list of products on a bounded pool, streaming each item as it completes."""
+    try:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        items = read_batch_items(body)
+    except HTTPException as http_ex:
+        logger.error(f"HTTP error: {str(http_ex)}")
+        return error_response(str(http_ex.detail), http_ex.status_code)
+    return StreamingResponse(
+        stream_batch_events(items),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def read_compare_request(body) -> dict:
+    """Validate a comparison body: a list of product names and an optional shared context."""
+    products = body.get('products') if isinstance(body, dict) else None
+    if not isinstance(products, list) or len(products) < 2:
+        raise HTTPException(status_code=400, detail="Comparison requires a 'products' list of at least two names")
+    max_products = int(os.getenv("COMPARE_MAX_PRODUCTS", 5))
+    if len(products) > max_products:
+        raise HTTPException(status_code=400, detail=f"Comparison is limited to {max_products} products")
+    for index, product in enumerate(products):
+        if not isinstance(product, str) or not product.strip():
+            raise HTTPException(status_code=400, detail=f"Product {index} must be a non-empty name")
+    context = body.get('context', "")
+    if not isinstance(context, str):
+        raise HTTPException(status_code=400, detail="Context must be a string")
+    return {'products': products, 'context': context}
+
+
+@app.post("/compare")
+async def compare(request: Request):
+    """
+    Compare several products with a single comparative synthesis. Each product's
+    analyst results are run or reused in parallel, and their charts are merged
+    into multi-dataset charts sharing one label axis.
+    """
+    try:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        compare_request = read_compare_request(body)
+        try:
+            comparison = await asyncio.to_thread(manager_pool.compare, compare_request['products'],
+                                                 compare_request['context'])
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except AgentError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return report_response(request, comparison)
+    except HTTPException as http_ex:
+        logger.error(f"HTTP error: {str(http_ex)}")
+        return error_response(str(http_ex.detail), http_ex.status_code)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response(str(e), 500)
+
+
+@app.get("/reports")
+async def search_reports(q: str = "", limit: int = 20, offset: int = 0):
+    """
+    Full-text search over every report produced so far, best match first.
+    Without q, lists the most recent reports. Paginate with limit and offset.
+    """
+    max_page_size = int(os.getenv("REPORTS_MAX_PAGE_SIZE", 100))
+    if not 1 <= limit <= max_page_size:
+        return error_response(f"limit must be between 1 and {max_page_size}", 400)
+    if offset < 0:
+        return error_response("offset must not be negative", 400)
+    try:
+        return await asyncio.to_thread(manager_pool.reports.search, q, limit, offset)
+    except StoreError as e:
+        logger.error(f"Report search failed: {str(e)}")
+        return error_response(str(e), 500)
+
+
+@app.get("/reports/{report_id}")
+async def get_history_report(report_id: int, request: Request):
+    """Return a report from the history by id."""
+    try:
+        report = await asyncio.to_thread(manager_pool.reports.get, report_id)
+    except StoreError as e:
+        logger.error(f"Report lookup failed: {str(e)}")
+        return error_response(str(e), 500)
+    if report is None:
+        return error_response("Report not found", 404)
+    return report_response(request, report)
+
+
+@app.post("/jobs")
+async def submit_job(request: Request):
+    """Queue an analysis and return its job id immediately."""
+    try:
+        analysis_request = await read_analysis_request(request)
+        try:
+            job = job_queue.submit(
+                run_analysis,
+                analysis_request['product_name'],
+                analysis_request['context'],
+                params=analysis_request
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        return CompactJSONResponse(content=job.to_dict(include_result=False), status_code=202)
+    except HTTPException as http_ex:
+        logger.error(f"HTTP error: {str(http_ex)}")
+        return error_response(str(http_ex.detail), http_ex.status_code)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """Report a job's status, and its result once completed."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return error_response("Job not found", 404)
+    return report_response(request, job.to_dict())
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return error_response("Job not found", 404)
+    return CompactJSONResponse(content=job.to_dict(include_result=False))
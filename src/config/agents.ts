@@ -42,6 +42,7 @@ export const agents: AgentConfig[] = [
 
 export const API_ENDPOINTS = {
   analyze: 'http://localhost:8000/analyze',
+  analyzeStream: 'http://localhost:8000/analyze/stream',
   health: 'http://localhost:8000/health',
   cacheStats: 'http://localhost:8000/cache/stats',
   cacheClear: 'http://localhost:8000/cache/clear'
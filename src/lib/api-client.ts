@@ -30,6 +30,48 @@ export async function analyzeMarket(request: ResearchRequest): Promise<ResearchR
   }
 }
 
+export interface StageEvent {
+  stage: 'market' | 'consumer' | 'industry' | 'manager' | 'complete' | 'error';
+  status: string;
+  content?: string;
+  charts?: any[];
+  tables?: any[];
+  error?: string;
+  response?: ResearchResponse;
+}
+
+export async function analyzeMarketStream(
+  request: ResearchRequest,
+  onEvent: (event: StageEvent) => void
+): Promise<void> {
+  const response = await fetch(API_ENDPOINTS.analyzeStream, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(request)
+  })
+
+  if (!response.ok || !response.body) {
+    throw new ApiError(response.status, await response.text())
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const messages = buffer.split('\n\n')
+    buffer = messages.pop() || ''
+    for (const message of messages) {
+      const data = message.split('\n').find(line => line.startsWith('data: '))
+      if (data) {
+        onEvent(JSON.parse(data.slice(6)))
+      }
+    }
+  }
+}
+
 export async function checkHealth(): Promise<{ status: string; timestamp: string }> {
   try {
     const response = await fetch(API_ENDPOINTS.health)